@@ -0,0 +1,78 @@
+"""
+Rows/second for each ingestion reader (xlsx, csv, tsv, jsonl) on the same
+synthetic record book, plus the legacy full load_workbook path for reference.
+
+Usage: python benchmarks/bench_ingestion.py [rows]
+"""
+import datetime
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from openpyxl import Workbook, load_workbook
+import ingestion
+from log_generator import read_tasks_from_sheet
+
+DEFAULT_ROWS = 20000
+REPEAT = 3
+
+
+def make_rows(count):
+    start = datetime.datetime(2000, 1, 1)
+    return [(start + datetime.timedelta(days=i), f"Worked on ticket {i}, reviewed code and updated docs") for i in range(count)]
+
+
+def encode_all(rows):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "task_sheet"
+    ws.append(["date", "description"])
+    for day, text in rows:
+        ws.append([day, text])
+    xlsx = io.BytesIO()
+    wb.save(xlsx)
+
+    csv_text = "date,description\n" + "".join(f'{day.date().isoformat()},"{text}"\n' for day, text in rows)
+    tsv_text = "".join(f"{day.date().isoformat()}\t{text}\n" for day, text in rows)
+    jsonl_text = "".join(json.dumps({"date": day.date().isoformat(), "description": text}) + "\n" for day, text in rows)
+    return {
+        "xlsx": xlsx.getvalue(),
+        "csv": csv_text.encode(),
+        "tsv": tsv_text.encode(),
+        "jsonl": jsonl_text.encode(),
+    }
+
+
+def legacy_xlsx(file_content):
+    return read_tasks_from_sheet(load_workbook(filename=io.BytesIO(file_content)), "task_sheet")
+
+
+def best_of(func, payload):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        tasks = func(payload)
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(tasks)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    payloads = encode_all(make_rows(count))
+
+    cases = [("xlsx (legacy load_workbook)", legacy_xlsx, payloads["xlsx"])]
+    for file_format, payload in payloads.items():
+        cases.append((file_format, ingestion.READERS[file_format], payload))
+
+    print(f"{'reader':<28} {'bytes':>10} {'rows':>7} {'ms':>9} {'rows/s':>11}")
+    for name, func, payload in cases:
+        seconds, rows = best_of(func, payload)
+        assert rows == count, (name, rows)
+        print(f"{name:<28} {len(payload):>10} {rows:>7} {seconds * 1000:>9.1f} {rows / seconds:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
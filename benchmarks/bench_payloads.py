@@ -0,0 +1,132 @@
+"""
+Serialization time and payload size for a 52-week report: FastAPI's legacy
+jsonable_encoder + json.dumps path over the raw objects, the explicit response
+schemas serialized by pydantic-core, and orjson over the same schemas. Wire
+sizes are measured through the app (GZipMiddleware) with and without
+Accept-Encoding: gzip.
+
+Usage: python benchmarks/bench_payloads.py
+"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base, get_db
+from models import Report, WeekEntry, ReportStatus
+from domain import LogbookReport, Task, Week
+from schemas import UploadResponse, ReportPreviewOut, WeekEntryOut
+import repository
+
+WEEK_COUNT = 52
+REPEAT = 200
+
+
+def make_weeks(count):
+    weeks = []
+    for i in range(count):
+        tasks = [
+            Task(f"2025-01-{d:02d}", f"Implemented feature {i}-{d} for the reporting module, reviewed pull requests and wrote integration tests", "4.2, 4.5")
+            for d in range(1, 6)
+        ]
+        weeks.append(Week(
+            week_ending=f"2025-W{i:02d}",
+            tasks=tasks,
+            tasks_summary_text="".join(f"- {t.description}\n" for t in tasks),
+            problems="Flaky integration tests slowed down the release and blocked two merges.",
+            solutions="Isolated the tests, added retries around network calls and pinned the test database.",
+        ))
+    return weeks
+
+
+def legacy(content):
+    # What FastAPI did for endpoints without a response model
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def schema(adapter):
+    return lambda content: adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def schema_orjson(adapter):
+    import orjson
+    return lambda content: orjson.dumps(adapter.dump_python(adapter.validate_python(content, from_attributes=True), mode="json"))
+
+
+def best_ms(serialize, content):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        serialize(content)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def wire_bytes(client, path, encoding):
+    response = client.get(path, headers={"Accept-Encoding": encoding})
+    response.raise_for_status()
+    return response.num_bytes_downloaded
+
+
+def main():
+    import main as app_module
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        db = SessionLocal()
+        report = repository.save_report(db, LogbookReport(weeks=make_weeks(WEEK_COUNT), status=ReportStatus.SUBMITTED))
+        row = db.query(Report).filter(Report.id == report.id).first()
+        week_rows = db.query(WeekEntry).filter(WeekEntry.report_id == report.id).all()
+        payloads = [
+            ("upload", report, TypeAdapter(UploadResponse)),
+            ("preview", LogbookReport.from_row(row), TypeAdapter(ReportPreviewOut)),
+            ("weeks", week_rows, TypeAdapter(List[WeekEntryOut])),
+        ]
+
+        try:
+            import orjson # noqa: F401
+            has_orjson = True
+        except ImportError:
+            has_orjson = False
+
+        print(f"{WEEK_COUNT}-week report, best of {REPEAT}\n")
+        print(f"{'payload':<8} {'legacy ms':>10} {'schema ms':>10} {'orjson ms':>10} {'raw bytes':>10} {'gzip bytes':>11}")
+        for name, content, adapter in payloads:
+            body = schema(adapter)(content)
+            orjson_ms = f"{best_ms(schema_orjson(adapter), content):>10.2f}" if has_orjson else f"{'n/a':>10}"
+            print(
+                f"{name:<8} {best_ms(legacy, content):>10.2f} {best_ms(schema(adapter), content):>10.2f} {orjson_ms} "
+                f"{len(body):>10} {len(gzip.compress(body, 6)):>11}"
+            )
+        db.close()
+
+        def override_get_db():
+            session = SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app_module.app.dependency_overrides[get_db] = override_get_db
+        client = TestClient(app_module.app)
+        print(f"\n{'endpoint':<40} {'identity':>9} {'gzip':>7}")
+        for path in (f"/api/student/reports/{report.id}/preview", f"/api/reports/{report.id}/weeks"):
+            print(f"{path:<40} {wire_bytes(client, path, 'identity'):>9} {wire_bytes(client, path, 'gzip'):>7}")
+        app_module.app.dependency_overrides.clear()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
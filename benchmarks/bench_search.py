@@ -0,0 +1,114 @@
+"""
+Full-text search latency over a large synthetic database, compared with the
+naive approach of loading every WeekEntry and scanning its text in Python.
+
+Usage: python benchmarks/bench_search.py [weeks]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models import Report, WeekEntry, ReportStatus
+import search
+
+DEFAULT_WEEKS = 50000
+WEEKS_PER_REPORT = 26
+QUERIES = ["database migration", "unit tests", "deploy*", "customer requirements meeting", "refactor api"]
+REPEAT = 20
+
+VOCABULARY = (
+    "implemented reviewed deployed tested refactored documented designed debugged migrated configured "
+    "database api frontend backend migration schema tests pipeline release customer requirements meeting "
+    "dashboard report server cache queue authentication logging monitoring container network module"
+).split()
+
+
+# Most words come from a long tail so that queries on the common vocabulary are selective
+LONG_TAIL = [f"term{n}" for n in range(5000)]
+COMMON_WORD_RATE = 0.08
+
+
+def sentence(rng, words=12):
+    picked = (rng.choice(VOCABULARY) if rng.random() < COMMON_WORD_RATE else rng.choice(LONG_TAIL) for _ in range(words))
+    return " ".join(picked).capitalize() + "."
+
+
+def populate(SessionLocal, week_count):
+    rng = random.Random(7)
+    statuses = [ReportStatus.DRAFT, ReportStatus.SUBMITTED, ReportStatus.COMPLETED]
+    db = SessionLocal()
+    try:
+        report_count = week_count // WEEKS_PER_REPORT
+        db.execute(insert(Report), [
+            {"student_name": f"Student {i % 500}", "status": statuses[i % 3]} for i in range(report_count)
+        ])
+        db.execute(insert(WeekEntry), [
+            {
+                "report_id": i % report_count + 1,
+                "week_ending": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                "tasks_summary": "".join(f"- {sentence(rng)}\n" for _ in range(5)),
+                "tasks_json": "[]",
+                "problems": sentence(rng, 20),
+                "solutions": sentence(rng, 20),
+                "supervisor_comment": sentence(rng, 10),
+            }
+            for i in range(week_count)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def naive_scan(db, query):
+    words = query.replace("*", "").lower().split()
+    hits = []
+    for week in db.query(WeekEntry).all():
+        haystack = " ".join(filter(None, [week.tasks_summary, week.problems, week.solutions, week.supervisor_comment])).lower()
+        if all(word in haystack for word in words):
+            hits.append(week.id)
+    return len(hits)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    week_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_WEEKS
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        populate(SessionLocal, week_count)
+        build_ms = timed(search.ensure_search_index, engine)
+        print(f"{week_count} weeks, index built in {build_ms:.0f} ms\n")
+
+        db = SessionLocal()
+        try:
+            print(f"{'query':<32} {'matches':>8} {'p50 ms':>8} {'p95 ms':>8} {'filtered p50':>13} {'naive ms':>9}")
+            for query in QUERIES:
+                total, _ = search.search_weeks(db, query)
+                plain = [timed(search.search_weeks, db, query) for _ in range(REPEAT)]
+                filtered = [timed(search.search_weeks, db, query, ReportStatus.SUBMITTED.value, "Student 42") for _ in range(REPEAT)]
+                naive = timed(naive_scan, db, query)
+                db.expunge_all()
+                p95 = statistics.quantiles(plain, n=20)[-1]
+                print(f"{query:<32} {total:>8} {statistics.median(plain):>8.1f} {p95:>8.1f} "
+                      f"{statistics.median(filtered):>13.1f} {naive:>9.0f}")
+        finally:
+            db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
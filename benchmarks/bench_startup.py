@@ -0,0 +1,54 @@
+"""
+Startup profile for the API: cold-process import time of main.py and a
+breakdown of the slowest imports it pulls in (via python -X importtime).
+
+Usage: python benchmarks/bench_startup.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 10
+TOP_IMPORTS = 12
+
+IMPORT_APP = f"import sys; sys.path.insert(0, {ROOT!r}); import main"
+TIMED_IMPORT = (
+    "import time; _t = time.perf_counter(); "
+    + IMPORT_APP
+    + "; print(time.perf_counter() - _t)"
+)
+
+
+def run(args, cwd):
+    return subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True, text=True, check=True)
+
+
+def main():
+    # Run from an empty directory so nothing is picked up from a local logbook.db
+    with tempfile.TemporaryDirectory() as tmp:
+        timings = [float(run(["-c", TIMED_IMPORT], tmp).stdout.strip().splitlines()[-1]) for _ in range(RUNS)]
+        print(f"import main: median {statistics.median(timings) * 1000:.1f} ms, "
+              f"min {min(timings) * 1000:.1f} ms over {RUNS} cold processes")
+        print(f"database created on import: {os.path.exists(os.path.join(tmp, 'logbook.db'))}")
+
+        profile = run(["-X", "importtime", "-c", IMPORT_APP], tmp).stderr
+        rows = []
+        for line in profile.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative_us, name = line.split("|")
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            rows.append((int(cumulative_us), depth, name.strip()))
+
+    # depth 0 is main itself, depth 1 are the modules main imports directly
+    print("\nslowest imports made by main.py (cumulative):")
+    direct = [row for row in rows if row[1] <= 1]
+    for cumulative_us, depth, name in sorted(direct, reverse=True)[:TOP_IMPORTS]:
+        print(f"  {cumulative_us / 1000:>8.1f} ms  {'  ' * depth}{name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compares upload persistence time for the legacy per-object ORM path
+(commit + refresh + db.add per week + commit) against repository.save_report.
+
+Usage: python benchmarks/bench_upload_persistence.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models import Report, WeekEntry, ReportStatus
+from domain import LogbookReport, Task, Week
+import repository
+
+WEEK_COUNTS = [52, 260, 1040]
+REPEAT = 5
+
+
+def make_weeks(count):
+    weeks = []
+    for i in range(count):
+        tasks = [Task(f"2025-01-{d:02d}", f"Implemented feature {i}-{d} and wrote tests", "4.2, 4.5") for d in range(1, 6)]
+        weeks.append(Week(
+            week_ending=f"week-{i}",
+            tasks=tasks,
+            tasks_summary_text="".join(f"- {t.description}\n" for t in tasks),
+            problems="Flaky integration tests slowed down the release.",
+            solutions="Isolated the tests and added retries around network calls.",
+        ))
+    return weeks
+
+
+def legacy_save(db, weeks):
+    new_report = Report(student_name="Student", status=ReportStatus.DRAFT)
+    db.add(new_report)
+    db.commit()
+    db.refresh(new_report)
+    for week in weeks:
+        db.add(WeekEntry(**week.to_row_values(new_report.id)))
+    db.commit()
+    return new_report.id
+
+
+def bulk_save(db, weeks):
+    return repository.save_report(db, LogbookReport(weeks=weeks, status=ReportStatus.DRAFT)).id
+
+
+def best_of(SessionLocal, save, weeks):
+    timings = []
+    for _ in range(REPEAT):
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            save(db, weeks)
+            timings.append(time.perf_counter() - start)
+        finally:
+            db.close()
+    return min(timings)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        print(f"{'weeks':>6} {'legacy ms':>10} {'bulk ms':>8} {'speedup':>8}")
+        for count in WEEK_COUNTS:
+            weeks = make_weeks(count)
+            legacy_s = best_of(SessionLocal, legacy_save, weeks)
+            bulk_s = best_of(SessionLocal, bulk_save, weeks)
+            print(f"{count:>6} {legacy_s * 1000:>10.2f} {bulk_s * 1000:>8.2f} {legacy_s / bulk_s:>7.1f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
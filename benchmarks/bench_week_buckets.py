@@ -0,0 +1,75 @@
+"""
+Compares the legacy day-by-day week loop against bucket_tasks_by_week
+over multi-year date ranges.
+
+Usage: python benchmarks/bench_week_buckets.py
+"""
+import datetime
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from week_buckets import bucket_tasks_by_week
+
+START_DATE = datetime.date(2015, 1, 1)
+YEARS = [1, 5, 20]
+REPEAT = 5
+
+
+def legacy_weeks(tasks_data, start_date, end_date):
+    """The original while-loop from parse_excel_to_weeks, minus the LLM calls."""
+    weeks = []
+    current_date = start_date
+    current_week_tasks = []
+    current_week_summary_text = ""
+    while current_date <= end_date:
+        if current_date in tasks_data:
+            current_week_tasks.append((current_date, tasks_data[current_date]))
+            current_week_summary_text += f"- {tasks_data[current_date]}\n"
+        if current_date.weekday() == 6 or current_date == end_date:
+            if current_week_tasks:
+                weeks.append((current_date, current_week_tasks, current_week_summary_text))
+            current_week_tasks = []
+            current_week_summary_text = ""
+        current_date += datetime.timedelta(days=1)
+    return weeks
+
+
+def bucketed_weeks(tasks_data, start_date, end_date):
+    return [
+        (bucket.week_ending, bucket.tasks, bucket.summary_text)
+        for bucket in bucket_tasks_by_week(tasks_data, start_date, end_date)
+    ]
+
+
+def make_tasks(start_date, end_date):
+    rng = random.Random(42)
+    tasks = {}
+    day = start_date
+    while day <= end_date:
+        if day.weekday() < 5 and rng.random() < 0.9:
+            tasks[day] = f"Worked on feature {rng.randint(1, 500)} and reviewed pull requests"
+        day += datetime.timedelta(days=1)
+    return tasks
+
+
+def main():
+    print(f"{'years':>5} {'tasks':>7} {'weeks':>6} {'legacy ms':>10} {'bucketed ms':>12} {'speedup':>8}")
+    for years in YEARS:
+        end_date = START_DATE.replace(year=START_DATE.year + years) - datetime.timedelta(days=1)
+        tasks = make_tasks(START_DATE, end_date)
+
+        legacy = legacy_weeks(tasks, START_DATE, end_date)
+        bucketed = bucketed_weeks(tasks, START_DATE, end_date)
+        assert [(w[0], w[2]) for w in legacy] == [(w[0], w[2]) for w in bucketed]
+
+        legacy_s = min(timeit.repeat(lambda: legacy_weeks(tasks, START_DATE, end_date), number=1, repeat=REPEAT))
+        bucketed_s = min(timeit.repeat(lambda: bucketed_weeks(tasks, START_DATE, end_date), number=1, repeat=REPEAT))
+        print(f"{years:>5} {len(tasks):>7} {len(bucketed):>6} {legacy_s * 1000:>10.2f} "
+              f"{bucketed_s * 1000:>12.2f} {legacy_s / bucketed_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models import Activity, ActivityCatalogue
+
+logger = logging.getLogger("logbook.catalogue")
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+_IMPORT_ATTEMPTS = 3
+
+# Catalogue versions never change once written, so snapshots can be cached for the process lifetime
+_snapshots: Dict[int, "CatalogueSnapshot"] = {}
+
+@dataclass(slots=True, frozen=True)
+class CatalogueSnapshot:
+    version: int
+    entries: Tuple[Tuple[str, str], ...] # (number, description) in sheet order
+    prompt_text: str
+    descriptions: Dict[str, str]
+    word_index: Dict[str, FrozenSet[str]] # lower-cased word -> activity numbers
+
+    def search(self, query: str) -> List[Tuple[str, str]]:
+        """
+        Activities whose description contains every word of the query, in catalogue order.
+        """
+        words = _WORD.findall(query.lower())
+        if not words:
+            return []
+        matches = frozenset.intersection(*(self.word_index.get(word, frozenset()) for word in words))
+        return [entry for entry in self.entries if entry[0] in matches]
+
+def render_prompt_text(entries: List[Tuple[str, str]]) -> str:
+    return "\n".join(f"{number} {description}" for number, description in entries)
+
+def _build_snapshot(version: int, entries: List[Tuple[str, str]], prompt_text: str) -> CatalogueSnapshot:
+    word_index: Dict[str, set] = {}
+    for number, description in entries:
+        for word in _WORD.findall(description.lower()):
+            word_index.setdefault(word, set()).add(number)
+    return CatalogueSnapshot(
+        version=version,
+        entries=tuple(entries),
+        prompt_text=prompt_text,
+        descriptions=dict(entries),
+        word_index={word: frozenset(numbers) for word, numbers in word_index.items()},
+    )
+
+def import_catalogue(db: Session, entries: List[Tuple[str, str]]) -> CatalogueSnapshot:
+    """
+    Stores a new catalogue version, or returns the latest one if the list is unchanged.
+    """
+    prompt_text = render_prompt_text(entries)
+    checksum = hashlib.sha256(prompt_text.encode("utf-8")).hexdigest()
+
+    # Versions are assigned as latest + 1, so a concurrent import can claim the same number;
+    # the unique constraint catches that and the loop re-reads the latest version
+    for attempt in range(_IMPORT_ATTEMPTS):
+        latest = db.query(ActivityCatalogue).order_by(ActivityCatalogue.version.desc()).first()
+        if latest and latest.checksum == checksum:
+            logger.info("Activity catalogue unchanged, keeping version %s", latest.version)
+            return get_catalogue(db, latest.version)
+
+        version = (latest.version if latest else 0) + 1
+        try:
+            catalogue_id = db.execute(
+                insert(ActivityCatalogue)
+                .values(version=version, checksum=checksum, prompt_text=prompt_text)
+                .returning(ActivityCatalogue.id)
+            ).scalar_one()
+            if entries:
+                db.execute(insert(Activity), [
+                    {"catalogue_id": catalogue_id, "position": position, "number": number, "description": description}
+                    for position, (number, description) in enumerate(entries)
+                ])
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            logger.warning("Catalogue version %s was taken by a concurrent import, retrying", version)
+            if attempt == _IMPORT_ATTEMPTS - 1:
+                raise
+        except Exception:
+            db.rollback()
+            raise
+
+    logger.info("Imported activity catalogue version %s with %d activities", version, len(entries))
+    snapshot = _build_snapshot(version, entries, prompt_text)
+    _snapshots[version] = snapshot
+    return snapshot
+
+def latest_version(db: Session) -> Optional[int]:
+    return db.query(func.max(ActivityCatalogue.version)).scalar()
+
+def get_catalogue(db: Session, version: Optional[int] = None) -> Optional[CatalogueSnapshot]:
+    """
+    Returns the requested catalogue version (latest when None), or None if it does not exist.
+    """
+    if version is None:
+        version = latest_version(db)
+        if version is None:
+            return None
+    if version in _snapshots:
+        return _snapshots[version]
+
+    row = db.query(ActivityCatalogue).filter(ActivityCatalogue.version == version).first()
+    if not row:
+        return None
+    entries = [(activity.number, activity.description) for activity in row.activities]
+    snapshot = _build_snapshot(row.version, entries, row.prompt_text)
+    _snapshots[version] = snapshot
+    return snapshot
@@ -0,0 +1,62 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import update
+from database import SessionLocal
+from models import WeekEntry
+import generation
+import log_generator
+
+logger = logging.getLogger("logbook.drafts")
+
+# A single background worker keeps draft generation from competing with
+# interactive requests for the model; drafts simply queue behind each other.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="comment-drafts")
+
+def enqueue_report(report_id: int):
+    """
+    Schedules AI comment drafts for every week of a submitted report.
+    """
+    logger.info("Queued comment drafts for report %s", report_id)
+    _executor.submit(_draft_report, report_id)
+
+def shutdown():
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+def _draft_report(report_id: int):
+    import requests
+
+    db = SessionLocal()
+    try:
+        weeks = (
+            db.query(WeekEntry.id, WeekEntry.tasks_summary)
+            .filter(WeekEntry.report_id == report_id, WeekEntry.suggested_comment.is_(None))
+            .all()
+        )
+        drafted = 0
+        for week_id, tasks_summary in weeks:
+            # The supervisor may have opened the report and drafted this week live in the meantime
+            if db.query(WeekEntry.suggested_comment).filter(WeekEntry.id == week_id).scalar() is not None:
+                continue
+            try:
+                comment = log_generator.generate_supervisor_comment_with_ollama(tasks_summary)
+            except requests.exceptions.RequestException as e:
+                # The model is unreachable; the remaining weeks would fail the same way
+                logger.warning("Stopped drafting report %s, LLM unavailable: %s", report_id, e)
+                break
+            except generation.MalformedOutputError as e:
+                # No draft stored, so the review endpoints fall back to a live call for this week
+                logger.warning("No comment draft for week %s: %s", week_id, e)
+                continue
+            # Conditional write so a draft stored live while the model was running is kept
+            result = db.execute(
+                update(WeekEntry)
+                .where(WeekEntry.id == week_id, WeekEntry.suggested_comment.is_(None))
+                .values(suggested_comment=comment)
+            )
+            db.commit() # Make each draft available as soon as it is ready
+            drafted += result.rowcount
+        logger.info("Drafted comments for %d of %d weeks of report %s", drafted, len(weeks), report_id)
+    except Exception:
+        logger.exception("Comment drafting failed for report %s", report_id)
+    finally:
+        db.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -17,3 +17,29 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def init_db():
+    """
+    Creates any missing tables. Called from the app lifespan rather than at import
+    so that importing the app (workers, tests, tooling) does not touch the database.
+    """
+    import models  # noqa: F401 - registers the tables on Base.metadata
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+
+    import search
+    search.ensure_search_index(engine)
+
+def _add_missing_columns():
+    """
+    Minimal migration: adds columns that exist on the models but not yet in an
+    older database file. Only suitable for nullable columns.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
@@ -0,0 +1,76 @@
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass(slots=True)
+class Task:
+    date: str # YYYY-MM-DD
+    description: str
+    activity_no: str
+
+    def to_dict(self) -> Dict:
+        return {"date": self.date, "description": self.description, "activity_no": self.activity_no}
+
+
+@dataclass(slots=True)
+class Week:
+    week_ending: str # YYYY-MM-DD
+    tasks: List[Task]
+    tasks_summary_text: str = ""
+    problems: str = ""
+    solutions: str = ""
+    supervisor_comment: str = ""
+    id: Optional[int] = None
+
+    @classmethod
+    def from_row(cls, row) -> "Week":
+        """
+        Builds a Week from a WeekEntry row, decoding the stored tasks_json once.
+        """
+        return cls(
+            week_ending=row.week_ending,
+            tasks=[Task(t["date"], t["description"], t["activity_no"]) for t in json.loads(row.tasks_json or "[]")],
+            tasks_summary_text=row.tasks_summary or "",
+            problems=row.problems or "",
+            solutions=row.solutions or "",
+            supervisor_comment=row.supervisor_comment or "",
+            id=row.id,
+        )
+
+    def to_row_values(self, report_id: int) -> Dict:
+        """
+        Column values for a WeekEntry insert.
+        """
+        return {
+            "report_id": report_id,
+            "week_ending": self.week_ending,
+            "tasks_summary": self.tasks_summary_text,
+            "tasks_json": json.dumps([task.to_dict() for task in self.tasks]),
+            "problems": self.problems,
+            "solutions": self.solutions,
+            "supervisor_comment": self.supervisor_comment,
+        }
+
+
+@dataclass(slots=True)
+class LogbookReport:
+    weeks: List[Week] = field(default_factory=list)
+    id: Optional[int] = None
+    student_name: str = "Student"
+    status: str = "DRAFT"
+    catalogue_version: Optional[int] = None
+
+    @property
+    def report_id(self) -> Optional[int]:
+        return self.id
+
+    @classmethod
+    def from_row(cls, row) -> "LogbookReport":
+        return cls(
+            weeks=[Week.from_row(week) for week in row.weeks],
+            id=row.id,
+            student_name=row.student_name,
+            status=row.status,
+            catalogue_version=row.catalogue_version,
+        )
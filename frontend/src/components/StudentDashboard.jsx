@@ -148,9 +148,9 @@ function StudentDashboard() {
                         <input type="date" value={endDate} onChange={e => setEndDate(e.target.value)} required />
                     </div>
                     <div className="form-group">
-                        <label>Excel File</label>
+                        <label>Record Book (Excel, CSV or JSON Lines)</label>
                         <div className="file-input-wrapper">
-                            <input type="file" accept=".xlsx" onChange={e => setFile(e.target.files[0])} required />
+                            <input type="file" accept=".xlsx,.csv,.tsv,.txt,.jsonl,.ndjson" onChange={e => setFile(e.target.files[0])} required />
                         </div>
                     </div>
 
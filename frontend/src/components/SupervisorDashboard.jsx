@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 
 const getInitials = (name = '') => {
@@ -15,52 +15,120 @@ function SupervisorDashboard() {
     const [selectedReport, setSelectedReport] = useState(null);
     const [weeks, setWeeks] = useState([]);
     const [signature, setSignature] = useState(null);
+    const [signatureStored, setSignatureStored] = useState(false);
     const [loading, setLoading] = useState(false);
     const [bulkComment, setBulkComment] = useState('');
     const [showBulkActions, setShowBulkActions] = useState(false);
+    const pendingComments = useRef({});
+    const flushTimer = useRef(null);
 
     useEffect(() => {
         fetchReports();
+        fetchSignatureStatus();
+    }, []);
+
+    useEffect(() => {
+        // Edits still waiting for the batch timer must not be lost when the tab closes or the dashboard unmounts
+        const sendPendingComments = () => {
+            clearTimeout(flushTimer.current);
+            const comments = takePendingComments();
+            if (comments.length === 0) return;
+            // keepalive lets the request outlive the page, which axios cannot do
+            fetch('http://localhost:8000/api/supervisor/comments', {
+                method: 'POST',
+                keepalive: true,
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ comments })
+            }).catch(err => console.error("Error saving comments", err));
+        };
+        window.addEventListener('beforeunload', sendPendingComments);
+        return () => {
+            window.removeEventListener('beforeunload', sendPendingComments);
+            sendPendingComments();
+        };
     }, []);
 
     const fetchReports = async () => {
         try {
-            const res = await axios.get('http://localhost:8000/api/supervisor/reports');
+            // Reports arrive with their weeks, so opening a review needs no further requests
+            const res = await axios.get('http://localhost:8000/api/supervisor/review');
             setReports(res.data);
         } catch (err) {
             console.error("Error fetching reports", err);
         }
     };
 
-    const handleSelectReport = async (report) => {
-        setSelectedReport(report);
+    const fetchSignatureStatus = async () => {
         try {
-            const res = await axios.get(`http://localhost:8000/api/reports/${report.id}/weeks`);
-            setWeeks(res.data);
+            // A stored signature lets finalize run without uploading the image again
+            const res = await axios.get('http://localhost:8000/api/supervisor/signature');
+            setSignatureStored(res.data.stored);
         } catch (err) {
-            console.error("Error fetching weeks", err);
+            console.error("Error fetching signature status", err);
         }
     };
 
+    const handleSelectReport = (report) => {
+        setSelectedReport(report);
+        setWeeks(report.weeks);
+    };
+
+    const handleBackToReports = async () => {
+        await flushComments();
+        setSelectedReport(null);
+        fetchReports();
+    };
+
     const handleCommentChange = async (weekId, comment) => {
         // Optimistic update
         setWeeks(weeks.map(w => w.id === weekId ? { ...w, supervisor_comment: comment } : w));
     };
 
-    const saveComment = async (weekId, comment) => {
+    const takePendingComments = () => {
+        const comments = Object.entries(pendingComments.current).map(([weekId, comment]) => ({
+            week_id: Number(weekId),
+            comment
+        }));
+        pendingComments.current = {};
+        return comments;
+    };
+
+    const flushComments = async () => {
+        clearTimeout(flushTimer.current);
+        const comments = takePendingComments();
+        if (comments.length === 0) return;
         try {
-            const formData = new FormData();
-            formData.append('comment', comment);
-            await axios.post(`http://localhost:8000/api/supervisor/weeks/${weekId}/comment`, formData);
+            await axios.post('http://localhost:8000/api/supervisor/comments', { comments });
         } catch (err) {
-            console.error("Error saving comment", err);
+            console.error("Error saving comments", err);
+            // Keep the failed edits queued unless they have been edited again since
+            pendingComments.current = {
+                ...Object.fromEntries(comments.map(c => [c.week_id, c.comment])),
+                ...pendingComments.current
+            };
         }
     };
 
+    const saveComment = (weekId, comment) => {
+        // Edits are batched into one request per pause instead of one request per week
+        pendingComments.current[weekId] = comment;
+        clearTimeout(flushTimer.current);
+        flushTimer.current = setTimeout(flushComments, 1500);
+    };
+
     const generateAIComment = async (weekId) => {
+        // Queued edits go out first so the batch timer cannot overwrite the generated comment later;
+        // an edit that failed to save is older than the new comment, so it is dropped
+        await flushComments();
+        delete pendingComments.current[weekId];
+        const week = weeks.find(w => w.id === weekId);
+        // The first click uses the draft prepared on submit; clicking again asks the model for a fresh one
+        const regenerate = Boolean(week?.suggested_comment) && week.supervisor_comment === week.suggested_comment;
         try {
-            const res = await axios.post(`http://localhost:8000/api/supervisor/weeks/${weekId}/generate-ai-comment`);
-            setWeeks(weeks.map(w => w.id === weekId ? { ...w, supervisor_comment: res.data.comment } : w));
+            const res = await axios.post(`http://localhost:8000/api/supervisor/weeks/${weekId}/generate-ai-comment`, null, {
+                params: { regenerate }
+            });
+            setWeeks(weeks.map(w => w.id === weekId ? { ...w, supervisor_comment: res.data.comment, suggested_comment: res.data.comment } : w));
         } catch (err) {
             console.error("Error generating AI comment", err);
         }
@@ -72,6 +140,8 @@ function SupervisorDashboard() {
             return;
         }
 
+        await flushComments();
+        pendingComments.current = {};
         try {
             const formData = new FormData();
             formData.append('comment', bulkComment);
@@ -90,6 +160,8 @@ function SupervisorDashboard() {
 
     const generateAICommentsForAll = async () => {
         setLoading(true);
+        await flushComments();
+        pendingComments.current = {};
         try {
             const res = await axios.post(`http://localhost:8000/api/supervisor/reports/${selectedReport.id}/generate-ai-comments-all`);
 
@@ -114,13 +186,17 @@ function SupervisorDashboard() {
     };
 
     const handleFinalize = async () => {
-        if (!signature) {
+        if (!signature && !signatureStored) {
             alert("Please upload a signature.");
             return;
         }
         setLoading(true);
+        await flushComments();
         const formData = new FormData();
-        formData.append('signature', signature);
+        if (signature) {
+            // Only a newly chosen image is sent; otherwise the server uses the stored signature
+            formData.append('signature', signature);
+        }
 
         try {
             const res = await axios.post(`http://localhost:8000/api/supervisor/reports/${selectedReport.id}/finalize`, formData, {
@@ -136,6 +212,10 @@ function SupervisorDashboard() {
             link.click();
 
             alert("Report finalized and downloaded!");
+            if (signature) {
+                setSignatureStored(true);
+                setSignature(null);
+            }
             setSelectedReport(null);
             fetchReports();
         } catch (err) {
@@ -199,7 +279,7 @@ function SupervisorDashboard() {
             ) : (
                 <div className="review-container">
                     <div className="review-nav">
-                        <button className="secondary-btn" onClick={() => setSelectedReport(null)}>
+                        <button className="secondary-btn" onClick={handleBackToReports}>
                             ← Back to Reports
                         </button>
                     </div>
@@ -302,10 +382,16 @@ function SupervisorDashboard() {
 
                     <div className="finalize-section">
                         <h4>Finalize Report</h4>
-                        <p>Upload your signature to sign and download the final Excel report.</p>
+                        <p>
+                            {signatureStored
+                                ? "Your saved signature will be used. Upload a new image only to replace it."
+                                : "Upload your signature to sign and download the final Excel report."}
+                        </p>
 
                         <div className="signature-upload">
-                            <label style={{ display: 'block', marginBottom: '10px', color: '#ccc' }}>Upload Signature (Image)</label>
+                            <label style={{ display: 'block', marginBottom: '10px', color: '#ccc' }}>
+                                {signatureStored ? "Replace Signature (Optional)" : "Upload Signature (Image)"}
+                            </label>
                             <input type="file" accept="image/*" onChange={e => setSignature(e.target.files[0])} style={{ color: 'white' }} />
                         </div>
 
@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, TypeVar
+
+logger = logging.getLogger("logbook.generation")
+
+T = TypeVar("T")
+
+# The retry must not decode greedily, or it tends to repeat the rejected answer
+RETRY_MIN_TEMPERATURE = 0.3
+
+class MalformedOutputError(ValueError):
+    """Raised when the model output still fails validation after the retry."""
+
+@dataclass(slots=True, frozen=True)
+class GenerationProfile:
+    """Decoding budget for one prompt type, sent to Ollama as request options."""
+    name: str
+    num_predict: int
+    temperature: float
+    stop: List[str] = field(default_factory=list)
+
+    def payload(self, model: str, prompt: str, output_format=None) -> Dict:
+        options = {"num_predict": self.num_predict, "temperature": self.temperature}
+        if self.stop:
+            options["stop"] = self.stop
+        payload = {"model": model, "prompt": prompt, "stream": False, "options": options}
+        if output_format is not None:
+            payload["format"] = output_format
+        return payload
+
+    def retry_payload(self, model: str, prompt: str, error: Exception, truncated: bool, output_format=None) -> Dict:
+        """
+        Payload for the single retry. The rejection reason is fed back to the model and
+        decoding is loosened, since a greedy profile would otherwise repeat its answer.
+        """
+        retry_prompt = f"{prompt}\n\nYour previous answer was rejected: {error}. Answer again, following the required format exactly."
+        payload = self.payload(model, retry_prompt, output_format)
+        payload["options"]["temperature"] = max(self.temperature, RETRY_MIN_TEMPERATURE)
+        if truncated:
+            payload["options"]["num_predict"] = self.num_predict * 2
+        return payload
+
+# Activity numbers are a short JSON list, so they get a tight cap and greedy decoding.
+ACTIVITY_PROFILE = GenerationProfile("activity", num_predict=64, temperature=0.0)
+SUMMARY_PROFILE = GenerationProfile("summary", num_predict=320, temperature=0.4)
+COMMENT_PROFILE = GenerationProfile("comment", num_predict=96, temperature=0.5, stop=["\n\n"])
+
+PROFILES = {profile.name: profile for profile in (ACTIVITY_PROFILE, SUMMARY_PROFILE, COMMENT_PROFILE)}
+
+@dataclass(slots=True)
+class ProfileStats:
+    calls: int = 0 # logical generate() calls
+    attempts: int = 0 # Ollama requests, including retries
+    retries: int = 0
+    failures: int = 0
+    eval_tokens: int = 0
+    eval_ms: float = 0.0
+    request_ms: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "failures": self.failures,
+            "retry_rate": self.retries / self.calls if self.calls else 0.0,
+            # Per Ollama request, so a retried call contributes two samples
+            "avg_eval_tokens": self.eval_tokens / self.attempts if self.attempts else 0.0,
+            "avg_decode_ms": self.eval_ms / self.attempts if self.attempts else 0.0,
+            "avg_request_ms": self.request_ms / self.attempts if self.attempts else 0.0,
+            "decode_tokens_per_s": self.eval_tokens / (self.eval_ms / 1000) if self.eval_ms else 0.0,
+        }
+
+_stats: Dict[str, ProfileStats] = {name: ProfileStats() for name in PROFILES}
+_stats_lock = threading.Lock()
+
+def get_generation_stats() -> Dict[str, Dict]:
+    with _stats_lock:
+        return {name: stats.to_dict() for name, stats in _stats.items()}
+
+def _record(profile: GenerationProfile, response_data: Dict, request_ms: float, retry: bool):
+    with _stats_lock:
+        stats = _stats[profile.name]
+        stats.calls += int(not retry)
+        stats.attempts += 1
+        stats.retries += int(retry)
+        stats.eval_tokens += response_data.get("eval_count", 0)
+        stats.eval_ms += response_data.get("eval_duration", 0) / 1e6 # Ollama reports nanoseconds
+        stats.request_ms += request_ms
+
+def generate(
+    profile: GenerationProfile,
+    prompt: str,
+    validate: Callable[[str], T],
+    model: str,
+    host: str,
+    output_format=None,
+) -> T:
+    """
+    Calls Ollama with the profile's budget and returns validate(response_text).
+    Malformed or truncated output is retried once with the error fed back;
+    connection errors propagate to the caller.
+    """
+    import requests
+
+    payload = profile.payload(model, prompt, output_format)
+    for attempt in range(2):
+        started = time.perf_counter()
+        response = requests.post(f"{host}/api/generate", json=payload, timeout=300)
+        response.raise_for_status()
+        response_data = response.json()
+        _record(profile, response_data, (time.perf_counter() - started) * 1000, retry=attempt > 0)
+        # Output cut off by num_predict can still parse (a half comment), so it never counts as valid
+        truncated = response_data.get("done_reason") == "length"
+        try:
+            if truncated:
+                raise ValueError(f"it was cut off at {payload['options']['num_predict']} tokens, keep it shorter")
+            return validate(response_data.get("response", ""))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Malformed %s output (attempt %d): %s", profile.name, attempt + 1, e)
+            payload = profile.retry_payload(model, prompt, e, truncated, output_format)
+
+    with _stats_lock:
+        _stats[profile.name].failures += 1
+    raise MalformedOutputError(f"{profile.name} output failed validation twice")
@@ -0,0 +1,151 @@
+import contextlib
+import csv
+import datetime
+import io
+import json
+import logging
+import os
+import zipfile
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger("logbook.ingestion")
+
+TaskMap = Dict[datetime.date, str]
+
+# Readers turn raw upload bytes into {date: task description}; later rows win on duplicate dates
+READERS: Dict[str, Callable[[bytes], TaskMap]] = {}
+
+EXTENSIONS = {
+    ".xlsx": "xlsx",
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+def reader(file_format: str):
+    def register(func: Callable[[bytes], TaskMap]):
+        READERS[file_format] = func
+        return func
+    return register
+
+def _parse_date(value) -> Optional[datetime.date]:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value.strip()[:10])
+        except ValueError:
+            return None
+    return None
+
+# Bytes that start like a zip but are not a workbook (truncated .xlsx, .docx, ...) fail
+# inside openpyxl in several ways; XML parse errors from ElementTree and lxml are SyntaxErrors
+_WORKBOOK_ERRORS = (zipfile.BadZipFile, KeyError, SyntaxError, OSError)
+
+@contextlib.contextmanager
+def open_workbook(file_content: bytes):
+    """
+    Opens an .xlsx upload read-only and closes it afterwards. Anything openpyxl
+    cannot read, while opening or iterating, is raised as ValueError.
+    """
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        wb = load_workbook(filename=io.BytesIO(file_content), read_only=True)
+    except (InvalidFileException, *_WORKBOOK_ERRORS) as e:
+        raise ValueError(f"Not a readable .xlsx workbook: {e}") from e
+    try:
+        yield wb
+    except _WORKBOOK_ERRORS as e:
+        raise ValueError(f"Not a readable .xlsx workbook: {e}") from e
+    finally:
+        wb.close()
+
+def detect_format(file_content: bytes, filename: Optional[str] = None) -> str:
+    """
+    Picks a reader from the file signature, then the extension, then the first line.
+    .txt and unknown extensions are always sniffed. Raises ValueError for formats we cannot read.
+    """
+    if file_content.startswith(b"PK\x03\x04"):
+        return "xlsx"
+    if file_content.startswith(b"\xd0\xcf\x11\xe0"):
+        raise ValueError("Legacy .xls workbooks are not supported, please save as .xlsx or .csv")
+
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension in EXTENSIONS:
+        return EXTENSIONS[extension]
+
+    first_line = file_content.lstrip(b"\xef\xbb\xbf \r\n").split(b"\n", 1)[0]
+    if first_line.startswith(b"{"):
+        return "jsonl"
+    if b"\t" in first_line:
+        return "tsv"
+    return "csv"
+
+def read_tasks(file_content: bytes, file_format: str) -> TaskMap:
+    if file_format not in READERS:
+        raise ValueError(f"Unsupported upload format: {file_format}")
+    tasks = READERS[file_format](file_content)
+    if not tasks:
+        logger.warning("No dated tasks found in %s upload", file_format)
+    logger.info("Read %d dated tasks from %s upload", len(tasks), file_format)
+    return tasks
+
+@reader("xlsx")
+def read_xlsx(file_content: bytes, task_sheet_name: str = "task_sheet") -> TaskMap:
+    from log_generator import read_tasks_from_sheet
+
+    with open_workbook(file_content) as wb:
+        return read_tasks_from_sheet(wb, task_sheet_name)
+
+def _read_delimited(file_content: bytes, delimiter: str) -> TaskMap:
+    tasks = {}
+    text = io.TextIOWrapper(io.BytesIO(file_content), encoding="utf-8-sig", newline="")
+    rows = csv.reader(text, delimiter=delimiter)
+    try:
+        for row in rows:
+            if len(row) < 2:
+                continue
+            # Header and malformed rows simply fail to parse as a date
+            task_date = _parse_date(row[0])
+            description = row[1].strip()
+            if task_date and description:
+                tasks[task_date] = description
+    except csv.Error as e:
+        raise ValueError(f"Line {rows.line_num}: {e}") from e
+    return tasks
+
+@reader("csv")
+def read_csv(file_content: bytes) -> TaskMap:
+    return _read_delimited(file_content, ",")
+
+@reader("tsv")
+def read_tsv(file_content: bytes) -> TaskMap:
+    return _read_delimited(file_content, "\t")
+
+@reader("jsonl")
+def read_jsonl(file_content: bytes) -> TaskMap:
+    """
+    One object per line with "date" and "description" (or "task") keys.
+    Raises ValueError naming the line when one is not a JSON object.
+    """
+    tasks = {}
+    for line_number, line in enumerate(io.TextIOWrapper(io.BytesIO(file_content), encoding="utf-8-sig"), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number}: invalid JSON ({e.msg})") from e
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_number}: expected a JSON object, got {type(record).__name__}")
+        task_date = _parse_date(record.get("date"))
+        description = str(record.get("description") or record.get("task") or "").strip()
+        if task_date and description:
+            tasks[task_date] = description
+    return tasks
@@ -1,13 +1,16 @@
 import datetime
-import requests
+import functools
 import json
 import logging
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, Border, Side, Alignment
-from openpyxl.drawing.image import Image
 import os
 import io
 from typing import List, Dict, Tuple
+from week_buckets import bucket_tasks_by_week
+from domain import Task, Week
+import generation
+
+# openpyxl, requests and Pillow are imported inside the functions that use them
+# so that importing this module (and therefore starting the API) stays cheap.
 
 # --- OLLAMA LLM CONFIGURATION ---
 OLLAMA_MODEL = "gemma3:4b"
@@ -15,14 +18,69 @@ OLLAMA_HOST = "http://localhost:11434"
 
 logger = logging.getLogger("logbook.generator")
 
-def get_activity_num_with_ollama(task_description, activity_list, model=OLLAMA_MODEL, host=OLLAMA_HOST):
+# Shown to the supervisor when the LLM cannot produce a comment; never stored as a draft
+FALLBACK_COMMENT = "Good progress this week."
+
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "problems_encountered": {"type": "string"},
+        "solutions_found": {"type": "string"},
+    },
+    "required": ["problems_encountered", "solutions_found"],
+}
+
+@functools.lru_cache(maxsize=8)
+def _activity_constraints(numbers: Tuple[str, ...]) -> Tuple[Dict, frozenset]:
+    """
+    JSON schema restricting the answer to 2-6 numbers from the catalogue, plus the
+    set of valid numbers. Cached because every task in an upload shares one catalogue.
+    """
+    schema = {
+        "type": "object",
+        "properties": {
+            "activity_numbers": {
+                "type": "array",
+                "items": {"type": "string", "enum": list(numbers)},
+                "minItems": 2,
+                "maxItems": 6,
+            },
+        },
+        "required": ["activity_numbers"],
+    }
+    return schema, frozenset(numbers)
+
+def _parse_activity_numbers(text: str, allowed: frozenset) -> List[str]:
+    numbers = json.loads(text)["activity_numbers"]
+    valid = list(dict.fromkeys(str(n).strip() for n in numbers if str(n).strip() in allowed))
+    if not valid:
+        raise ValueError(f"no catalogue activity numbers in {text[:80]!r}")
+    return valid[:6]
+
+def _parse_summary(text: str) -> Tuple[str, str]:
+    llm_output = json.loads(text)
+    problems = str(llm_output["problems_encountered"]).strip()
+    solutions = str(llm_output["solutions_found"]).strip()
+    if not problems or not solutions:
+        raise ValueError("empty problems or solutions")
+    return problems, solutions
+
+def _parse_comment(text: str) -> str:
+    comment = text.strip().strip('"').strip()
+    if not comment:
+        raise ValueError("empty comment")
+    return comment
+
+def get_activity_num_with_ollama(task_description, activity_catalogue, model=OLLAMA_MODEL, host=OLLAMA_HOST):
     """
     Uses the LLM to find matching activity numbers for a given task description.
+    activity_catalogue is a catalogue.CatalogueSnapshot (or None when no catalogue is stored).
     """
-    if not activity_list:
+    if activity_catalogue is None or not activity_catalogue.entries:
         return "N/A"
 
-    activities_str = "\n".join(activity_list)
+    import requests
+
     logger.info("Requesting activity numbers (task len=%d)", len(task_description))
     prompt = f"""
     You are a precise project management assistant. Your task is to analyze a work description and identify the MOST RELEVANT activities from the provided list.
@@ -31,39 +89,31 @@ def get_activity_num_with_ollama(task_description, activity_list, model=OLLAMA_M
     1. You MUST select between 2 and 6 activity numbers (minimum 2, maximum 6).
     2. Choose only the activities that are directly relevant to the work described.
     3. Rank them by relevance and select the top 2-6 matches.
-    4. Respond with ONLY the activity numbers, separated by a comma and a space.
+    4. Respond with a JSON object of the form {{"activity_numbers": ["3.4", "4.2"]}}.
     5. Do not add any explanation or other text.
 
     Here is the list of official activities:
     ---
-    {activities_str}
+    {activity_catalogue.prompt_text}
     ---
 
     Now, determine between 2 and 6 most relevant activity numbers for the following work description:
     "{task_description}"
     """
 
+    # Numbers come from the stored entries, not the prompt text, whose descriptions may span lines
+    schema, allowed = _activity_constraints(tuple(activity_catalogue.descriptions))
     try:
-        payload = {
-            "model": model,
-            "prompt": prompt,
-            "stream": False
-        }
-        response = requests.post(f"{host}/api/generate", json=payload, timeout=300)
-        response.raise_for_status()
-        response_data = response.json()
-        activity_num = response_data.get('response', 'N/A').strip()
-        logger.info("LLM activity response: %s", activity_num[:80])
-
-        if activity_num != 'N/A':
-            activities = [a.strip() for a in activity_num.split(',') if a.strip()]
-            if len(activities) > 6:
-                activities = activities[:6]
-            activity_num = ", ".join(activities)
-
+        activities = generation.generate(
+            generation.ACTIVITY_PROFILE, prompt,
+            lambda text: _parse_activity_numbers(text, allowed),
+            model, host, output_format=schema,
+        )
+        activity_num = ", ".join(activities)
+        logger.info("LLM activity response: %s", activity_num)
         return activity_num
 
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, generation.MalformedOutputError) as e:
         logger.error("LLM error while fetching activity numbers: %s", e)
         print(f"  - LLM Error (Activity No.): {e}")
         return "N/A"
@@ -89,14 +139,10 @@ Tasks for the week:
     ---
     """
     try:
-        payload = {"model": model, "prompt": prompt, "format": "json", "stream": False}
-        response = requests.post(f"{host}/api/generate", json=payload, timeout=300)
-        response.raise_for_status()
-        response_data = response.json()
-        llm_output = json.loads(response_data.get('response', '{}'))
-        problems = llm_output.get("problems_encountered", "Could not generate summary.")
-        solutions = llm_output.get("solutions_found", "Could not generate summary.")
-        return problems, solutions
+        return generation.generate(
+            generation.SUMMARY_PROFILE, prompt, _parse_summary,
+            model, host, output_format=SUMMARY_SCHEMA,
+        )
     except Exception as e:
         logger.error("Summary generation failed: %s", e)
         print(f"Error generating summary: {e}")
@@ -105,6 +151,8 @@ Tasks for the week:
 def generate_supervisor_comment_with_ollama(tasks_for_week, model=OLLAMA_MODEL, host=OLLAMA_HOST):
     """
     Generates a professional supervisor comment based on the week's tasks.
+    Raises on connection errors or malformed output so callers never mistake
+    FALLBACK_COMMENT for a model draft.
     """
     if not tasks_for_week.strip():
         return "No tasks recorded for this week."
@@ -119,17 +167,9 @@ def generate_supervisor_comment_with_ollama(tasks_for_week, model=OLLAMA_MODEL,
     Tasks:
     {tasks_for_week}
     """
-    try:
-        payload = {"model": model, "prompt": prompt, "stream": False}
-        response = requests.post(f"{host}/api/generate", json=payload, timeout=300)
-        response.raise_for_status()
-        comment = response.json().get('response', 'Good progress this week.').strip()
-        logger.info("Supervisor comment generated")
-        return comment
-    except Exception as e:
-        logger.error("Supervisor comment generation failed: %s", e)
-        print(f"Error generating supervisor comment: {e}")
-        return "Good progress this week."
+    comment = generation.generate(generation.COMMENT_PROFILE, prompt, _parse_comment, model, host)
+    logger.info("Supervisor comment generated")
+    return comment
 
 def read_tasks_from_sheet(wb, task_sheet_name):
     tasks = {}
@@ -143,80 +183,78 @@ def read_tasks_from_sheet(wb, task_sheet_name):
                     tasks[task_date] = str(task_description).strip()
     return tasks
 
-def read_activity_nums_from_sheet(wb, activity_nums_sheet_name):
-    activities = []
+def read_activity_entries_from_sheet(wb, activity_nums_sheet_name) -> List[Tuple[str, str]]:
+    entries = []
     if activity_nums_sheet_name in wb.sheetnames:
         ws_activities = wb[activity_nums_sheet_name]
         for row in ws_activities.iter_rows(min_row=1, values_only=True):
             if len(row) >= 3:
                 num, desc = row[1], row[2]
                 if num and desc and '.' in str(num):
-                    activities.append(f"{num} {desc}")
-    return activities
+                    entries.append((str(num), str(desc)))
+    return entries
+
+def read_activity_catalogue(file_content: bytes, activity_nums_sheet_name: str = "activity_nums") -> List[Tuple[str, str]]:
+    """
+    Reads (number, description) pairs from the activity sheet of a workbook, for catalogue imports.
+    Raises ValueError if the bytes are not a readable .xlsx workbook.
+    """
+    import ingestion
 
-def parse_excel_to_weeks(file_content: bytes, start_date_str: str, end_date_str: str) -> List[Dict]:
+    with ingestion.open_workbook(file_content) as wb:
+        return read_activity_entries_from_sheet(wb, activity_nums_sheet_name)
+
+def _build_weeks(tasks_data, start_date, end_date, activity_catalogue) -> List[Week]:
+    weeks = []
+    for bucket in bucket_tasks_by_week(tasks_data, start_date, end_date):
+        week_tasks = []
+        for task_date, task_desc in bucket.tasks:
+            activity_num = get_activity_num_with_ollama(task_desc, activity_catalogue)
+            week_tasks.append(Task(task_date.strftime("%Y-%m-%d"), task_desc, activity_num))
+
+        summary_text = bucket.summary_text
+        problems, solutions = generate_summary_with_ollama(summary_text)
+        weeks.append(Week(
+            week_ending=bucket.week_ending.strftime("%Y-%m-%d"),
+            tasks=week_tasks,
+            tasks_summary_text=summary_text,
+            problems=problems,
+            solutions=solutions,
+        ))
+    return weeks
+
+def parse_upload_to_weeks(file_content: bytes, start_date_str: str, end_date_str: str, activity_catalogue=None, file_format: str = None) -> List[Week]:
     """
-    Parses the uploaded Excel file and returns a list of weekly data structures.
+    Reads an uploaded record book in any format ingestion supports (xlsx, csv, tsv, jsonl)
+    and returns a list of weekly data structures. activity_catalogue is the
+    catalogue.CatalogueSnapshot used for activity numbers.
     """
+    import ingestion
+
     try:
-        logger.info("Parsing Excel between %s and %s", start_date_str, end_date_str)
-        wb = load_workbook(filename=io.BytesIO(file_content))
+        file_format = file_format or ingestion.detect_format(file_content)
+        logger.info("Parsing %s upload between %s and %s", file_format, start_date_str, end_date_str)
         start_date = datetime.datetime.strptime(start_date_str, "%Y-%m-%d").date()
         end_date = datetime.datetime.strptime(end_date_str, "%Y-%m-%d").date()
-        
-        tasks_data = read_tasks_from_sheet(wb, "task_sheet")
-        activity_nums_data = read_activity_nums_from_sheet(wb, "activity_nums")
-        
-        weeks = []
-        current_date = start_date
-        
-        # Align to the start of the week (Monday) if needed, or just iterate
-        # Logic: Iterate day by day. When Sunday is reached, close the week.
-        
-        current_week_tasks = []
-        current_week_summary_text = ""
-        
-        while current_date <= end_date:
-            day_index = current_date.weekday() # 0=Mon, 6=Sun
-            
-            if current_date in tasks_data:
-                task_desc = tasks_data[current_date]
-                activity_num = get_activity_num_with_ollama(task_desc, activity_nums_data)
-                current_week_tasks.append({
-                    "date": current_date.strftime("%Y-%m-%d"),
-                    "description": task_desc,
-                    "activity_no": activity_num
-                })
-                current_week_summary_text += f"- {task_desc}\n"
-            
-            if day_index == 6 or current_date == end_date:
-                # End of week
-                if current_week_tasks:
-                    problems, solutions = generate_summary_with_ollama(current_week_summary_text)
-                    weeks.append({
-                        "week_ending": current_date.strftime("%Y-%m-%d"),
-                        "tasks": current_week_tasks,
-                        "tasks_summary_text": current_week_summary_text,
-                        "problems": problems,
-                        "solutions": solutions,
-                        "supervisor_comment": "" # To be filled later
-                    })
-                current_week_tasks = []
-                current_week_summary_text = ""
-            
-            current_date += datetime.timedelta(days=1)
-            
+
+        tasks_data = ingestion.read_tasks(file_content, file_format)
+        weeks = _build_weeks(tasks_data, start_date, end_date, activity_catalogue)
         logger.info("Parsed %d weeks", len(weeks))
         return weeks
     except Exception as e:
-        logger.exception("Failed to parse Excel")
-        print(f"Error parsing Excel: {e}")
+        logger.exception("Failed to parse upload")
+        print(f"Error parsing upload: {e}")
         raise e
 
-def create_final_excel(weeks_data: List[Dict], signature_img_bytes: bytes = None) -> io.BytesIO:
+def create_final_excel(weeks_data: List[Week], signature_img_bytes: bytes = None) -> io.BytesIO:
     """
     Generates the final Excel file from the approved weekly data.
     """
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Border, Side, Alignment
+    from openpyxl.drawing.image import Image
+    from xlsx_media import SharedImage, save_workbook
+
     logger.info("Building final workbook for %d weeks (signature=%s)", len(weeks_data), bool(signature_img_bytes))
     wb = Workbook()
     ws = wb.active
@@ -234,12 +272,22 @@ def create_final_excel(weeks_data: List[Dict], signature_img_bytes: bytes = None
     center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
     thin_side = Side(border_style="thin", color="000000")
     thin_border = Border(left=thin_side, right=thin_side, top=thin_side, bottom=thin_side)
+
+    signature_img = None
+    if signature_img_bytes:
+        try:
+            signature_img = Image(io.BytesIO(signature_img_bytes))
+            signature_img.width = 120
+            signature_img.height = 35
+        except Exception as e:
+            logger.error("Failed to load signature image: %s", e)
+            print(f"Error adding signature: {e}")
     
     for week in weeks_data:
         # Header
         ws[f'A{row_offset}'] = "WEEK ENDING"
         ws[f'A{row_offset}'].font = bold_font
-        ws[f'B{row_offset}'] = week['week_ending']
+        ws[f'B{row_offset}'] = week.week_ending
         ws[f'B{row_offset}'].font = bold_font
         
         headers = {'A': "DAYS", 'B': "DATE", 'C': "DESCRIPTION OF WORK CARRIED OUT", 'D': "ACTIVITY NO."}
@@ -252,10 +300,10 @@ def create_final_excel(weeks_data: List[Dict], signature_img_bytes: bytes = None
             cell.border = thin_border
             
         days_of_week = ["MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY", "SATURDAY", "SUNDAY"]
-        week_start_date = datetime.datetime.strptime(week['week_ending'], "%Y-%m-%d").date() - datetime.timedelta(days=6)
+        week_start_date = datetime.datetime.strptime(week.week_ending, "%Y-%m-%d").date() - datetime.timedelta(days=6)
         
         # Fill days
-        task_map = {t['date']: t for t in week['tasks']}
+        task_map = {t.date: t for t in week.tasks}
         
         for i, day in enumerate(days_of_week):
             current_row = row_offset + 2 + i
@@ -271,9 +319,9 @@ def create_final_excel(weeks_data: List[Dict], signature_img_bytes: bytes = None
             if date_str in task_map:
                 task = task_map[date_str]
                 ws[f'B{current_row}'].value = date_str
-                ws[f'C{current_row}'].value = task['description']
+                ws[f'C{current_row}'].value = task.description
                 ws[f'C{current_row}'].alignment = Alignment(wrap_text=True)
-                ws[f'D{current_row}'].value = task['activity_no']
+                ws[f'D{current_row}'].value = task.activity_no
                 ws[f'D{current_row}'].alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
         
         # Problems/Solutions
@@ -285,11 +333,11 @@ def create_final_excel(weeks_data: List[Dict], signature_img_bytes: bytes = None
         ws[f'D{row_offset + 9}'].font = bold_font
         ws[f'D{row_offset + 9}'].border = thin_border
         
-        ws[f'C{row_offset + 10}'].value = week['problems']
+        ws[f'C{row_offset + 10}'].value = week.problems
         ws[f'C{row_offset + 10}'].alignment = Alignment(wrap_text=True)
         ws[f'C{row_offset + 10}'].border = thin_border
         
-        ws[f'D{row_offset + 10}'].value = week['solutions']
+        ws[f'D{row_offset + 10}'].value = week.solutions
         ws[f'D{row_offset + 10}'].alignment = Alignment(wrap_text=True)
         ws[f'D{row_offset + 10}'].border = thin_border
         
@@ -300,7 +348,7 @@ def create_final_excel(weeks_data: List[Dict], signature_img_bytes: bytes = None
         ws[f'A{row_offset + 11}'].border = thin_border
         
         ws.merge_cells(f'A{row_offset + 12}:D{row_offset + 12}')
-        ws[f'A{row_offset + 12}'].value = week.get('supervisor_comment', '')
+        ws[f'A{row_offset + 12}'].value = week.supervisor_comment or ''
         ws[f'A{row_offset + 12}'].alignment = Alignment(wrap_text=True)
         ws[f'A{row_offset + 12}'].border = thin_border
         
@@ -321,22 +369,14 @@ def create_final_excel(weeks_data: List[Dict], signature_img_bytes: bytes = None
         
         ws.row_dimensions[row_offset + 13].height = 40
         
-        if signature_img_bytes:
-            try:
-                img = Image(io.BytesIO(signature_img_bytes))
-                img.width = 120
-                img.height = 35
-                img.anchor = f'C{row_offset + 13}'
-                ws.add_image(img)
-                ws[f'C{row_offset + 13}'].value = "" # Clear text
-            except Exception as e:
-                logger.error("Failed to add signature image: %s", e)
-                print(f"Error adding signature: {e}")
+        if signature_img:
+            anchor = f'C{row_offset + 13}'
+            # Every week after the first reuses the same embedded media part
+            ws.add_image(signature_img if row_offset == 1 else SharedImage(signature_img, anchor), anchor)
+            ws[f'C{row_offset + 13}'].value = "" # Clear text
         
         row_offset += 16
         
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
+    output = save_workbook(wb)
     logger.info("Workbook ready (%d bytes)", output.getbuffer().nbytes)
     return output
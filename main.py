@@ -1,19 +1,36 @@
-from fastapi import FastAPI, UploadFile, File, Form, Depends, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile, File, Form, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
-import json
 import io
 import logging
-from database import engine, Base, get_db
+from database import get_db, init_db
 from models import Report, WeekEntry, ReportStatus
+from domain import LogbookReport
+from schemas import (
+    UploadResponse, ReportOut, ReportPreviewOut, WeekEntryOut, ReviewReportOut, BatchCommentUpdate, SearchResults,
+)
 import log_generator
+import repository
+import signature_store
+import comment_drafts
+import catalogue
+import ingestion
+import generation
+import search
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema management runs once per process at startup, not on import
+    init_db()
+    yield
+    comment_drafts.shutdown()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -24,6 +41,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class JSONGZipMiddleware(GZipMiddleware):
+    """
+    Gzips API responses but passes .xlsx downloads through untouched: a workbook is
+    already a zip archive, so compressing it again only costs CPU.
+    """
+    workbook_paths = ("/download", "/finalize")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith(self.workbook_paths):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Report payloads are repetitive JSON and compress well; small responses are left
+# alone since compressing them costs more than it saves
+app.add_middleware(JSONGZipMiddleware, minimum_size=1024, compresslevel=6)
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s %(levelname)s [%(name)s] %(message)s"
@@ -32,46 +66,53 @@ logger = logging.getLogger("logbook.api")
 
 # --- STUDENT ENDPOINTS ---
 
-@app.post("/api/student/upload")
+@app.post("/api/student/upload", response_model=UploadResponse)
 async def upload_and_parse(
     start_date: str = Form(...),
     end_date: str = Form(...),
     file: UploadFile = File(...),
+    catalogue_version: Optional[int] = Form(None),
     db: Session = Depends(get_db)
 ):
-    logger.info("Student upload start %s -> %s", start_date, end_date)
+    logger.info("Student upload start %s -> %s (catalogue=%s)", start_date, end_date, catalogue_version)
+    contents = await file.read()
+    try:
+        file_format = ingestion.detect_format(contents, file.filename)
+    except ValueError as e:
+        logger.warning("Rejected upload: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    snapshot = catalogue.get_catalogue(db, catalogue_version)
+    if snapshot is None and catalogue_version is not None:
+        logger.warning("Catalogue version %s not found for upload", catalogue_version)
+        raise HTTPException(status_code=404, detail="Activity catalogue version not found")
     try:
-        contents = await file.read()
-        weeks_data = log_generator.parse_excel_to_weeks(contents, start_date, end_date)
+        if snapshot is None and file_format == "xlsx":
+            # No catalogue stored yet: seed it from the workbook's activity_nums sheet
+            entries = log_generator.read_activity_catalogue(contents)
+            if entries:
+                snapshot = catalogue.import_catalogue(db, entries)
+        weeks_data = log_generator.parse_upload_to_weeks(contents, start_date, end_date, snapshot, file_format)
         logger.info("Parsed %d weeks from upload", len(weeks_data))
 
-        # Create Report
-        new_report = Report(student_name="Student", status=ReportStatus.DRAFT)
-        db.add(new_report)
-        db.commit()
-        db.refresh(new_report)
-        
-        # Create Week Entries
-        for week in weeks_data:
-            new_week = WeekEntry(
-                report_id=new_report.id,
-                week_ending=week['week_ending'],
-                tasks_summary=week['tasks_summary_text'],
-                tasks_json=json.dumps(week['tasks']),
-                problems=week['problems'],
-                solutions=week['solutions'],
-                supervisor_comment=""
+        new_report = repository.save_report(
+            db, LogbookReport(
+                weeks=weeks_data,
+                student_name="Student",
+                status=ReportStatus.DRAFT,
+                catalogue_version=snapshot.version if snapshot else None,
             )
-            db.add(new_week)
-        
-        db.commit()
+        )
         logger.info("Created report %s with %d weeks", new_report.id, len(weeks_data))
-        return {"report_id": new_report.id, "weeks": weeks_data}
+        return new_report
+    except ValueError as e:
+        # Unreadable upload content or dates, not a server fault
+        logger.warning("Rejected upload: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.exception("Student upload failed")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/student/reports/{report_id}")
+@app.get("/api/student/reports/{report_id}", response_model=ReportOut)
 def get_report(report_id: int, db: Session = Depends(get_db)):
     logger.info("Fetching report %s", report_id)
     report = db.query(Report).filter(Report.id == report_id).first()
@@ -89,9 +130,11 @@ def submit_report(report_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Report not found")
     report.status = ReportStatus.SUBMITTED
     db.commit()
+    # Week summaries are fixed from here on, so supervisor comment drafts can be prepared ahead of review
+    comment_drafts.enqueue_report(report_id)
     return {"status": "submitted"}
 
-@app.get("/api/student/reports/{report_id}/preview")
+@app.get("/api/student/reports/{report_id}/preview", response_model=ReportPreviewOut)
 def preview_report(report_id: int, db: Session = Depends(get_db)):
     """Get structured preview data for the report"""
     logger.info("Previewing report %s", report_id)
@@ -99,23 +142,8 @@ def preview_report(report_id: int, db: Session = Depends(get_db)):
     if not report:
         logger.warning("Report %s not found for preview", report_id)
         raise HTTPException(status_code=404, detail="Report not found")
-    
-    weeks_preview = []
-    for week in report.weeks:
-        tasks = json.loads(week.tasks_json)
-        weeks_preview.append({
-            "week_ending": week.week_ending,
-            "tasks": tasks,
-            "problems": week.problems,
-            "solutions": week.solutions,
-            "supervisor_comment": week.supervisor_comment or ""
-        })
-    
-    return {
-        "report_id": report.id,
-        "status": report.status,
-        "weeks": weeks_preview
-    }
+
+    return LogbookReport.from_row(report)
 
 @app.post("/api/student/reports/{report_id}/download")
 async def download_student_report(report_id: int, db: Session = Depends(get_db)):
@@ -125,17 +153,8 @@ async def download_student_report(report_id: int, db: Session = Depends(get_db))
     if not report:
         logger.warning("Report %s not found for download", report_id)
         raise HTTPException(status_code=404, detail="Report not found")
-    
-    weeks_data = []
-    for week in report.weeks:
-        weeks_data.append({
-            "week_ending": week.week_ending,
-            "tasks": json.loads(week.tasks_json),
-            "problems": week.problems,
-            "solutions": week.solutions,
-            "supervisor_comment": week.supervisor_comment or ""
-        })
-        
+
+    weeks_data = LogbookReport.from_row(report).weeks
     excel_file = log_generator.create_final_excel(weeks_data, signature_img_bytes=None)
     logger.info("Generated preview workbook for report %s", report_id)
 
@@ -146,14 +165,60 @@ async def download_student_report(report_id: int, db: Session = Depends(get_db))
     )
 
 
+# --- ACTIVITY CATALOGUE ENDPOINTS ---
+
+@app.post("/api/catalogue")
+async def import_catalogue(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Import the official activity list from a workbook's activity_nums sheet"""
+    logger.info("Importing activity catalogue")
+    try:
+        entries = log_generator.read_activity_catalogue(await file.read())
+    except ValueError as e:
+        logger.warning("Rejected catalogue upload: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    if not entries:
+        logger.warning("Catalogue upload had no activities")
+        raise HTTPException(status_code=400, detail="No activities found in the activity_nums sheet")
+    snapshot = catalogue.import_catalogue(db, entries)
+    return {"version": snapshot.version, "activities": len(snapshot.entries)}
+
+@app.get("/api/catalogue")
+def get_latest_catalogue(db: Session = Depends(get_db)):
+    snapshot = catalogue.get_catalogue(db)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="No activity catalogue imported")
+    return {"version": snapshot.version, "activities": [{"number": n, "description": d} for n, d in snapshot.entries]}
+
+@app.get("/api/catalogue/{version}/search")
+def search_catalogue(version: int, q: str, db: Session = Depends(get_db)):
+    snapshot = catalogue.get_catalogue(db, version)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Activity catalogue version not found")
+    return [{"number": n, "description": d} for n, d in snapshot.search(q)]
+
+
 # --- SUPERVISOR ENDPOINTS ---
 
-@app.get("/api/supervisor/reports")
+@app.get("/api/supervisor/reports", response_model=List[ReportOut])
 def list_reports(db: Session = Depends(get_db)):
     logger.info("Supervisor fetching submitted reports")
     return db.query(Report).filter(Report.status == ReportStatus.SUBMITTED).all()
 
-@app.get("/api/reports/{report_id}/weeks")
+@app.get("/api/supervisor/review", response_model=List[ReviewReportOut])
+def list_reports_for_review(db: Session = Depends(get_db)):
+    """Submitted reports together with all of their weeks, loaded in a single joined query"""
+    logger.info("Supervisor fetching review queue")
+    reports = (
+        db.query(Report)
+        .options(joinedload(Report.weeks))
+        .filter(Report.status == ReportStatus.SUBMITTED)
+        .order_by(Report.id)
+        .all()
+    )
+    logger.info("Review queue has %d reports", len(reports))
+    return reports
+
+@app.get("/api/reports/{report_id}/weeks", response_model=List[WeekEntryOut])
 def get_report_weeks(report_id: int, db: Session = Depends(get_db)):
     logger.info("Fetching weeks for report %s", report_id)
     weeks = db.query(WeekEntry).filter(WeekEntry.report_id == report_id).all()
@@ -170,15 +235,48 @@ def update_comment(week_id: int, comment: str = Form(...), db: Session = Depends
     db.commit()
     return {"status": "updated"}
 
+@app.post("/api/supervisor/comments")
+def update_comments(payload: BatchCommentUpdate, db: Session = Depends(get_db)):
+    """Save many week comments in one transaction"""
+    # Last write wins if the same week appears more than once
+    comments = {item.week_id: item.comment for item in payload.comments}
+    logger.info("Batch updating comments for %d weeks", len(comments))
+    if not comments:
+        return {"status": "updated", "weeks_updated": 0}
+
+    found = {week_id for (week_id,) in db.query(WeekEntry.id).filter(WeekEntry.id.in_(comments))}
+    missing = sorted(set(comments) - found)
+    if missing:
+        logger.warning("Weeks %s not found for batch comment", missing)
+        raise HTTPException(status_code=404, detail=f"Week entries not found: {missing}")
+
+    db.execute(update(WeekEntry), [
+        {"id": week_id, "supervisor_comment": comment} for week_id, comment in comments.items()
+    ])
+    db.commit()
+    return {"status": "updated", "weeks_updated": len(comments)}
+
+def _ai_comment_for(week: WeekEntry, regenerate: bool) -> str:
+    """Returns the precomputed draft when there is one, otherwise asks the model and keeps the result as the new draft"""
+    if week.suggested_comment and not regenerate:
+        return week.suggested_comment
+    try:
+        week.suggested_comment = log_generator.generate_supervisor_comment_with_ollama(week.tasks_summary)
+    except Exception as e:
+        # Leave the draft as it was so the next request asks the model again
+        logger.error("AI comment for week %s failed: %s", week.id, e)
+        return log_generator.FALLBACK_COMMENT
+    return week.suggested_comment
+
 @app.post("/api/supervisor/weeks/{week_id}/generate-ai-comment")
-def generate_ai_comment(week_id: int, db: Session = Depends(get_db)):
-    logger.info("Generating AI comment for week %s", week_id)
+def generate_ai_comment(week_id: int, regenerate: bool = False, db: Session = Depends(get_db)):
+    logger.info("Generating AI comment for week %s (regenerate=%s)", week_id, regenerate)
     week = db.query(WeekEntry).filter(WeekEntry.id == week_id).first()
     if not week:
         logger.warning("Week %s not found for AI comment", week_id)
         raise HTTPException(status_code=404, detail="Week entry not found")
-    
-    comment = log_generator.generate_supervisor_comment_with_ollama(week.tasks_summary)
+
+    comment = _ai_comment_for(week, regenerate)
     week.supervisor_comment = comment
     db.commit()
     return {"comment": comment}
@@ -201,7 +299,7 @@ def update_all_comments(report_id: int, comment: str = Form(...), db: Session =
     return {"status": "updated", "weeks_updated": len(weeks)}
 
 @app.post("/api/supervisor/reports/{report_id}/generate-ai-comments-all")
-def generate_ai_comments_all(report_id: int, db: Session = Depends(get_db)):
+def generate_ai_comments_all(report_id: int, regenerate: bool = False, db: Session = Depends(get_db)):
     """Generate AI comments for all weeks in a report"""
     logger.info("Generating AI comments for all weeks in report %s", report_id)
     report = db.query(Report).filter(Report.id == report_id).first()
@@ -213,7 +311,7 @@ def generate_ai_comments_all(report_id: int, db: Session = Depends(get_db)):
     updated_weeks = []
 
     for week in weeks:
-        comment = log_generator.generate_supervisor_comment_with_ollama(week.tasks_summary)
+        comment = _ai_comment_for(week, regenerate)
         week.supervisor_comment = comment
         updated_weeks.append({
             "id": week.id,
@@ -224,10 +322,28 @@ def generate_ai_comments_all(report_id: int, db: Session = Depends(get_db)):
     logger.info("Generated AI comments for %d weeks", len(weeks))
     return {"weeks": updated_weeks}
 
+def _store_signature(signature_bytes: bytes) -> bytes:
+    try:
+        return signature_store.save_signature(signature_bytes)
+    except ValueError as e:
+        logger.warning("Rejected signature upload: %s", e)
+        raise HTTPException(status_code=400, detail="Signature must be an image file")
+
+@app.post("/api/supervisor/signature")
+async def upload_signature(signature: UploadFile = File(...)):
+    """Store the supervisor signature once so finalize can reuse it"""
+    logger.info("Uploading supervisor signature")
+    _store_signature(await signature.read())
+    return {"status": "stored"}
+
+@app.get("/api/supervisor/signature")
+def get_signature_status():
+    return {"stored": signature_store.load_signature() is not None}
+
 @app.post("/api/supervisor/reports/{report_id}/finalize")
 async def finalize_report(
     report_id: int,
-    signature: UploadFile = File(...),
+    signature: Optional[UploadFile] = File(None),
     db: Session = Depends(get_db)
 ):
     logger.info("Finalizing report %s", report_id)
@@ -236,18 +352,15 @@ async def finalize_report(
         logger.warning("Report %s not found for finalize", report_id)
         raise HTTPException(status_code=404, detail="Report not found")
     
-    signature_bytes = await signature.read()
-    
-    weeks_data = []
-    for week in report.weeks:
-        weeks_data.append({
-            "week_ending": week.week_ending,
-            "tasks": json.loads(week.tasks_json),
-            "problems": week.problems,
-            "solutions": week.solutions,
-            "supervisor_comment": week.supervisor_comment
-        })
-        
+    if signature is not None:
+        signature_bytes = _store_signature(await signature.read())
+    else:
+        signature_bytes = signature_store.load_signature()
+        if signature_bytes is None:
+            logger.warning("No stored signature for finalize of report %s", report_id)
+            raise HTTPException(status_code=400, detail="No signature uploaded or stored")
+
+    weeks_data = LogbookReport.from_row(report).weeks
     excel_file = log_generator.create_final_excel(weeks_data, signature_bytes)
     
     report.status = ReportStatus.COMPLETED
@@ -260,6 +373,27 @@ async def finalize_report(
         headers={"Content-Disposition": f"attachment; filename=log_book_final.xlsx"}
     )
 
+# --- SEARCH ENDPOINTS ---
+
+@app.get("/api/search/weeks", response_model=SearchResults)
+def search_weeks(
+    q: str,
+    status: Optional[ReportStatus] = None,
+    student: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Ranked full-text search over week tasks, problems, solutions and supervisor comments"""
+    logger.info("Searching weeks for %r (status=%s, student=%s)", q, status, student)
+    total, results = search.search_weeks(db, q, status.value if status else None, student, limit, offset)
+    return {"total": total, "limit": limit, "offset": offset, "results": results}
+
+@app.get("/api/metrics/generation")
+def generation_metrics():
+    """Per prompt type LLM call counts, retry rates and decode timings since startup"""
+    return generation.get_generation_stats()
+
 @app.get("/health")
 def health_check():
     logger.info("Health check ping")
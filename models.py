@@ -16,6 +16,7 @@ class Report(Base):
     student_name = Column(String, index=True, default="Student") # Placeholder, can be expanded
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     status = Column(String, default=ReportStatus.DRAFT)
+    catalogue_version = Column(Integer, nullable=True) # ActivityCatalogue.version used for activity numbers
     
     # Relationships
     weeks = relationship("WeekEntry", back_populates="report", cascade="all, delete-orphan")
@@ -31,6 +32,31 @@ class WeekEntry(Base):
     problems = Column(Text)
     solutions = Column(Text)
     supervisor_comment = Column(Text, nullable=True)
+    suggested_comment = Column(Text, nullable=True) # AI draft precomputed on submit
     
     # Relationships
     report = relationship("Report", back_populates="weeks")
+
+class ActivityCatalogue(Base):
+    __tablename__ = "activity_catalogues"
+
+    id = Column(Integer, primary_key=True, index=True)
+    version = Column(Integer, unique=True, index=True)
+    checksum = Column(String, index=True) # sha256 of prompt_text, used to skip re-importing an identical list
+    prompt_text = Column(Text) # Pre-rendered "<number> <description>" lines for LLM prompts
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    # Relationships
+    activities = relationship("Activity", back_populates="catalogue", cascade="all, delete-orphan", order_by="Activity.position")
+
+class Activity(Base):
+    __tablename__ = "activities"
+
+    id = Column(Integer, primary_key=True, index=True)
+    catalogue_id = Column(Integer, ForeignKey("activity_catalogues.id"), index=True)
+    position = Column(Integer)
+    number = Column(String)
+    description = Column(Text)
+
+    # Relationships
+    catalogue = relationship("ActivityCatalogue", back_populates="activities")
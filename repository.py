@@ -0,0 +1,36 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from models import Report, WeekEntry
+from domain import LogbookReport
+
+
+def save_report(db: Session, report: LogbookReport) -> LogbookReport:
+    """
+    Persists a report and all of its weeks in a single transaction.
+    Weeks go through one executemany INSERT ... RETURNING, and the generated
+    ids are written back onto the domain objects.
+    """
+    try:
+        report.id = db.execute(
+            insert(Report)
+            .values(
+                student_name=report.student_name,
+                status=report.status,
+                catalogue_version=report.catalogue_version,
+            )
+            .returning(Report.id)
+        ).scalar_one()
+
+        if report.weeks:
+            week_ids = db.scalars(
+                insert(WeekEntry).returning(WeekEntry.id, sort_by_parameter_order=True),
+                [week.to_row_values(report.id) for week in report.weeks],
+            ).all()
+            for week, week_id in zip(report.weeks, week_ids):
+                week.id = week_id
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return report
@@ -0,0 +1,97 @@
+import datetime
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+
+
+class TaskOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    date: str
+    description: str
+    activity_no: str
+
+
+class WeekPreviewOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    week_ending: str
+    tasks: List[TaskOut]
+    problems: str
+    solutions: str
+    supervisor_comment: str = ""
+
+
+class UploadWeekOut(WeekPreviewOut):
+    tasks_summary_text: str
+
+
+class UploadResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    report_id: Optional[int]
+    weeks: List[UploadWeekOut]
+
+
+class ReportPreviewOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    report_id: Optional[int]
+    status: str
+    weeks: List[WeekPreviewOut]
+
+
+class ReportOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    student_name: str
+    created_at: datetime.datetime
+    status: str
+    catalogue_version: Optional[int] = None
+
+
+class ReviewWeekOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    week_ending: str
+    tasks_summary: Optional[str] = None
+    tasks_json: Optional[str] = None
+    problems: Optional[str] = None
+    solutions: Optional[str] = None
+    supervisor_comment: Optional[str] = None
+    suggested_comment: Optional[str] = None
+
+
+class WeekEntryOut(ReviewWeekOut):
+    report_id: int
+
+
+class ReviewReportOut(ReportOut):
+    weeks: List[ReviewWeekOut]
+
+
+class CommentUpdate(BaseModel):
+    week_id: int
+    comment: str
+
+
+class BatchCommentUpdate(BaseModel):
+    comments: List[CommentUpdate]
+
+
+class SearchHit(BaseModel):
+    week_id: int
+    report_id: int
+    week_ending: str
+    student_name: str
+    status: str
+    snippet: str
+    score: float
+
+
+class SearchResults(BaseModel):
+    total: int
+    limit: int
+    offset: int
+    results: List[SearchHit]
@@ -1,20 +1,44 @@
+import argparse
 import datetime
 import requests
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, Border, Side, Alignment
 from openpyxl.drawing.image import Image
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from week_buckets import bucket_tasks_by_week
 
 # --- CONFIGURATION ---
 EXCEL_FILE_PATH = "../my_record_book.xlsx"
 SIGNATURE_IMAGE_PATH = "../signature.png"  # Path to your signature image file
 DESIGNATION_TEXT = "Industrial Supervisor"  # Your designation
 
+# --- REPORT CONFIGURATION ---
+START_DATE = "2025-05-15"
+END_DATE = "2025-11-17"
+SHEET_NAME = "log"
+TASK_SHEET_NAME = "task_sheet"
+ACTIVITY_NUMS_SHEET_NAME = "activity_nums"
+
+# --- BATCH CONFIGURATION ---
+BATCH_WORKERS = 4
+BATCH_STATE_FILE = "batch_state.jsonl"  # Checkpoint of LLM results, used to resume interrupted batches
+
 # --- OLLAMA LLM CONFIGURATION ---
 OLLAMA_MODEL = "gemma3:4b"
 OLLAMA_HOST = "http://localhost:11434"
 
+# Placeholder results returned when the LLM could not be used
+ACTIVITY_NUM_UNAVAILABLE = "N/A"
+SUMMARY_UNREACHABLE = ("Ollama server not reachable.", "Please ensure Ollama is running.")
+SUMMARY_INVALID = ("Invalid response from LLM.", "Could not parse the summary.")
+
 
 def get_activity_num_with_ollama(task_description, activity_list, model=OLLAMA_MODEL, host=OLLAMA_HOST):
     """
@@ -121,10 +145,10 @@ Tasks for the week:
         return problems, solutions
     except requests.exceptions.RequestException as e:
         print(f"Error connecting to Ollama: {e}")
-        return "Ollama server not reachable.", "Please ensure Ollama is running."
+        return SUMMARY_UNREACHABLE
     except json.JSONDecodeError as e:
         print(f"Error decoding JSON from LLM response: {e}")
-        return "Invalid response from LLM.", "Could not parse the summary."
+        return SUMMARY_INVALID
 
 
 def create_table_structure(ws, start_row):
@@ -200,8 +224,16 @@ def read_activity_nums_from_sheet(wb, activity_nums_sheet_name):
     return activities
 
 
-def generate_weekly_report(start_date_str, end_date_str, sheet_name, task_sheet_name, activity_nums_sheet_name):
-    """Main function to generate the report and fill summaries with LLM."""
+def generate_weekly_report(start_date_str, end_date_str, sheet_name, task_sheet_name, activity_nums_sheet_name,
+                           excel_file_path=EXCEL_FILE_PATH,
+                           activity_fn=get_activity_num_with_ollama,
+                           summary_fn=generate_summary_with_ollama):
+    """
+    Main function to generate the report and fill summaries with LLM.
+
+    activity_fn and summary_fn default to the Ollama calls; batch mode swaps in
+    checkpointed versions. Returns a dict with the number of tasks and weeks written.
+    """
     try:
         start_date = datetime.datetime.strptime(start_date_str, "%Y-%m-%d").date()
         end_date = datetime.datetime.strptime(end_date_str, "%Y-%m-%d").date()
@@ -210,7 +242,7 @@ def generate_weekly_report(start_date_str, end_date_str, sheet_name, task_sheet_
         return
 
     try:
-        wb = load_workbook(EXCEL_FILE_PATH)
+        wb = load_workbook(excel_file_path)
         tasks_data = read_tasks_from_sheet(wb, task_sheet_name)
         activity_nums_data = read_activity_nums_from_sheet(wb, activity_nums_sheet_name)
         ws = wb[sheet_name] if sheet_name in wb.sheetnames else wb.create_sheet(title=sheet_name)
@@ -224,85 +256,270 @@ def generate_weekly_report(start_date_str, end_date_str, sheet_name, task_sheet_
         ws.column_dimensions['D'].width = 20
         tasks_data = read_tasks_from_sheet(wb, task_sheet_name)
         activity_nums_data = read_activity_nums_from_sheet(wb, activity_nums_sheet_name)
-        print(f"Info: '{EXCEL_FILE_PATH}' not found. A new file will be created.")
+        print(f"Info: '{excel_file_path}' not found. A new file will be created.")
 
     row_offset = ws.max_row + 3 if ws.max_row > 1 else 1
-    current_date = start_date
-    is_new_week = True
-    weekly_tasks_summary = ""
+    stats = {"tasks": 0, "weeks": 0}
 
-    while current_date <= end_date:
-        if is_new_week:
-            create_table_structure(ws, row_offset)
-            is_new_week = False
+    for bucket in bucket_tasks_by_week(tasks_data, start_date, end_date, include_empty=True):
+        create_table_structure(ws, row_offset)
+        week_tasks = dict(bucket.tasks)
 
-        day_index = current_date.weekday()
-        current_data_row = row_offset + 2 + day_index
-        ws[f'B{current_data_row}'].value = current_date.strftime("%Y-%m-%d")
+        current_date = bucket.week_start
+        while current_date <= bucket.week_ending:
+            current_data_row = row_offset + 2 + current_date.weekday()
+            ws[f'B{current_data_row}'].value = current_date.strftime("%Y-%m-%d")
 
-        if current_date in tasks_data:
-            task_description = tasks_data[current_date]
-            ws[f'C{current_data_row}'].value = task_description
-            ws[f'C{current_data_row}'].alignment = Alignment(wrap_text=True)
-            weekly_tasks_summary += f"- {task_description}\n"
+            if current_date in week_tasks:
+                task_description = week_tasks[current_date]
+                ws[f'C{current_data_row}'].value = task_description
+                ws[f'C{current_data_row}'].alignment = Alignment(wrap_text=True)
 
-            print(f"  - Analyzing task for {current_date} to find Activity No(s)...")
-            activity_num = get_activity_num_with_ollama(task_description, activity_nums_data)
-            activity_cell = ws[f'D{current_data_row}']
-            activity_cell.value = activity_num
-            # Changed alignment for better readability of multiple numbers
-            activity_cell.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
+                print(f"  - Analyzing task for {current_date} to find Activity No(s)...")
+                activity_num = activity_fn(task_description, activity_nums_data)
+                stats["tasks"] += 1
+                activity_cell = ws[f'D{current_data_row}']
+                activity_cell.value = activity_num
+                # Changed alignment for better readability of multiple numbers
+                activity_cell.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
 
-        if day_index == 6 or current_date == end_date:
-            ws[f'B{row_offset}'].value = current_date.strftime("%Y-%m-%d")
-            ws[f'B{row_offset}'].font = Font(bold=True)
+            current_date += datetime.timedelta(days=1)
 
-            print(f"\nGenerating summary for week ending {current_date}...")
-            problems, solutions = generate_summary_with_ollama(weekly_tasks_summary)
-            ws[f'C{row_offset + 10}'].value = problems
-            ws[f'D{row_offset + 10}'].value = solutions
+        ws[f'B{row_offset}'].value = bucket.week_ending.strftime("%Y-%m-%d")
+        ws[f'B{row_offset}'].font = Font(bold=True)
 
-            # Insert signature image locked to cell boundaries
-            if os.path.exists(SIGNATURE_IMAGE_PATH):
-                img = Image(SIGNATURE_IMAGE_PATH)
+        print(f"\nGenerating summary for week ending {bucket.week_ending}...")
+        problems, solutions = summary_fn(bucket.summary_text)
+        stats["weeks"] += 1
+        ws[f'C{row_offset + 10}'].value = problems
+        ws[f'D{row_offset + 10}'].value = solutions
 
-                # Resize image to fit within the merged C-D cells
-                # Keep aspect ratio but constrain to cell dimensions
-                img.width = 120
-                img.height = 35
+        # Insert signature image locked to cell boundaries
+        if os.path.exists(SIGNATURE_IMAGE_PATH):
+            img = Image(SIGNATURE_IMAGE_PATH)
 
-                # Anchor the image to cell C in the signature row
-                # The image will be positioned at the top-left corner of cell C
-                img.anchor = f'C{row_offset + 13}'
+            # Resize image to fit within the merged C-D cells
+            # Keep aspect ratio but constrain to cell dimensions
+            img.width = 120
+            img.height = 35
 
-                ws.add_image(img)
+            # Anchor the image to cell C in the signature row
+            # The image will be positioned at the top-left corner of cell C
+            img.anchor = f'C{row_offset + 13}'
 
-                # Clear the "SIGNATURE" text since image will be there
-                ws[f'C{row_offset + 13}'].value = ""
-            else:
-                print(f"Warning: Signature image not found at '{SIGNATURE_IMAGE_PATH}'.")
-                # Keep "SIGNATURE" text if no image found
+            ws.add_image(img)
 
-            # Add designation text in column A (top-left of merged A-B cells in row 13)
-            ws[f'A{row_offset + 13}'].value = f"DESIGNATION\n{DESIGNATION_TEXT}"
-            ws[f'A{row_offset + 13}'].font = Font(bold=True)
-            ws[f'A{row_offset + 13}'].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+            # Clear the "SIGNATURE" text since image will be there
+            ws[f'C{row_offset + 13}'].value = ""
+        else:
+            print(f"Warning: Signature image not found at '{SIGNATURE_IMAGE_PATH}'.")
+            # Keep "SIGNATURE" text if no image found
 
-            row_offset += 16
-            is_new_week = True
-            weekly_tasks_summary = ""
+        # Add designation text in column A (top-left of merged A-B cells in row 13)
+        ws[f'A{row_offset + 13}'].value = f"DESIGNATION\n{DESIGNATION_TEXT}"
+        ws[f'A{row_offset + 13}'].font = Font(bold=True)
+        ws[f'A{row_offset + 13}'].alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
 
-        current_date += datetime.timedelta(days=1)
+        row_offset += 16
 
-    wb.save(EXCEL_FILE_PATH)
-    print(f"\nSuccessfully updated report: {EXCEL_FILE_PATH} (Sheet: {sheet_name})")
+    wb.save(excel_file_path)
+    print(f"\nSuccessfully updated report: {excel_file_path} (Sheet: {sheet_name})")
+    return stats
 
 
-if __name__ == "__main__":
-    START_DATE = "2025-05-15"
-    END_DATE = "2025-11-17"
-    SHEET_NAME = "log"
-    TASK_SHEET_NAME = "task_sheet"
-    ACTIVITY_NUMS_SHEET_NAME = "activity_nums"
+class LLMUnavailableError(Exception):
+    """Raised in batch mode when the LLM returns a placeholder instead of a real result."""
+
+
+class BatchCheckpoint:
+    """
+    Append-only JSON Lines log of LLM results, keyed by record book and prompt input.
+    Each result is flushed as soon as it arrives, so an interrupted batch loses at most
+    the call that was in flight.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._results = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn final line from a killed run
+                    self._results[(record["book"], record["kind"], record["input"])] = record["result"]
+        self._file = open(path, "a", encoding="utf-8")
+
+    def get(self, book, kind, input_text):
+        return self._results.get((book, kind, input_text))
+
+    def put(self, book, kind, input_text, result):
+        with self._lock:
+            self._results[(book, kind, input_text)] = result
+            self._file.write(json.dumps({"book": book, "kind": kind, "input": input_text, "result": result}) + "\n")
+            self._file.flush()
+
+    def is_done(self, book):
+        return self.get(book, "book", "done") is not None
+
+    def mark_done(self, book):
+        self.put(book, "book", "done", True)
 
-    generate_weekly_report(START_DATE, END_DATE, SHEET_NAME, TASK_SHEET_NAME, ACTIVITY_NUMS_SHEET_NAME)
+    def close(self):
+        self._file.close()
+
+
+class LLMCallCounter:
+    """
+    LLM call counts shared by all batch workers. Updated as each call returns, so calls
+    made by a record book that later fails still show up in the batch summary.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.llm_calls = 0
+        self.cached = 0
+
+    def add(self, llm_calls=0, cached=0):
+        with self._lock:
+            self.llm_calls += llm_calls
+            self.cached += cached
+
+
+def load_batch_sources(source, start_date, end_date):
+    """
+    Returns (path, start_date, end_date) for every record book in a directory, or listed
+    in a manifest file with one "path[,start_date,end_date]" entry per line.
+    """
+    if os.path.isdir(source):
+        return [
+            (os.path.join(source, name), start_date, end_date)
+            for name in sorted(os.listdir(source))
+            if name.endswith(".xlsx") and not name.startswith("~$")
+        ]
+
+    books = []
+    manifest_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = [part.strip() for part in line.split(",")]
+            path = parts[0] if os.path.isabs(parts[0]) else os.path.join(manifest_dir, parts[0])
+            book_start, book_end = (parts[1], parts[2]) if len(parts) >= 3 else (start_date, end_date)
+            books.append((path, book_start, book_end))
+    return books
+
+
+def process_book(checkpoint, counter, path, start_date, end_date):
+    """Runs generate_weekly_report for one record book, serving LLM results from the checkpoint when possible."""
+    book = os.path.abspath(path)
+    if not os.path.exists(path):
+        # generate_weekly_report would start a blank workbook, which then looks finished on resume
+        raise FileNotFoundError(f"Record book not found: {path}")
+
+    def activity_fn(task_description, activity_list):
+        cached = checkpoint.get(book, "day", task_description)
+        if cached is not None:
+            counter.add(cached=1)
+            return cached
+        result = get_activity_num_with_ollama(task_description, activity_list)
+        counter.add(llm_calls=1)
+        if result == ACTIVITY_NUM_UNAVAILABLE and activity_list:
+            raise LLMUnavailableError(f"No activity numbers returned for task in {path}")
+        checkpoint.put(book, "day", task_description, result)
+        return result
+
+    def summary_fn(tasks_for_week):
+        if not tasks_for_week.strip():
+            # Empty weeks get a fixed placeholder without calling the model
+            return generate_summary_with_ollama(tasks_for_week)
+        cached = checkpoint.get(book, "week", tasks_for_week)
+        if cached is not None:
+            counter.add(cached=1)
+            return tuple(cached)
+        result = generate_summary_with_ollama(tasks_for_week)
+        counter.add(llm_calls=1)
+        if result in (SUMMARY_UNREACHABLE, SUMMARY_INVALID):
+            raise LLMUnavailableError(f"No weekly summary returned for {path}")
+        checkpoint.put(book, "week", tasks_for_week, list(result))
+        return result
+
+    report_stats = generate_weekly_report(
+        start_date, end_date, SHEET_NAME, TASK_SHEET_NAME, ACTIVITY_NUMS_SHEET_NAME,
+        excel_file_path=path, activity_fn=activity_fn, summary_fn=summary_fn,
+    )
+    if report_stats is None:
+        raise ValueError(f"Could not process {path}")
+    checkpoint.mark_done(book)
+    return report_stats
+
+
+def run_batch(source, start_date=START_DATE, end_date=END_DATE, workers=BATCH_WORKERS, state_file=BATCH_STATE_FILE):
+    """Processes many record books in a worker pool, resuming from the checkpoint state file."""
+    books = load_batch_sources(source, start_date, end_date)
+    checkpoint = BatchCheckpoint(state_file)
+    counter = LLMCallCounter()
+    totals = {"done": 0, "skipped": 0, "failed": 0, "tasks": 0, "weeks": 0, "llm_calls": 0, "cached": 0}
+    started = time.perf_counter()
+
+    pending = []
+    for path, book_start, book_end in books:
+        if checkpoint.is_done(os.path.abspath(path)):
+            totals["skipped"] += 1
+        else:
+            pending.append((path, book_start, book_end))
+    print(f"Batch: {len(books)} record book(s), {totals['skipped']} already done, {workers} worker(s)")
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(process_book, checkpoint, counter, *book): book[0] for book in pending}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    stats = future.result()
+                except Exception as e:
+                    totals["failed"] += 1
+                    print(f"Error: '{path}' failed and will resume on the next run: {e}")
+                    continue
+                totals["done"] += 1
+                for key in ("tasks", "weeks"):
+                    totals[key] += stats[key]
+    finally:
+        checkpoint.close()
+    # Includes calls made by record books that failed part-way
+    totals["llm_calls"], totals["cached"] = counter.llm_calls, counter.cached
+
+    elapsed = time.perf_counter() - started
+    print("\n--- Batch summary ---")
+    print(f"Record books: {totals['done']} processed, {totals['skipped']} skipped, {totals['failed']} failed")
+    print(f"Tasks: {totals['tasks']}, weeks: {totals['weeks']}")
+    print(f"LLM calls: {totals['llm_calls']} made, {totals['cached']} served from checkpoint")
+    print(f"Elapsed: {elapsed:.1f}s ({totals['done'] / elapsed * 60 if elapsed else 0:.2f} books/min, "
+          f"{totals['llm_calls'] / elapsed if elapsed else 0:.2f} LLM calls/s)")
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill weekly log book tables using a local Ollama model.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="Process many record books with checkpointing.")
+    batch_parser.add_argument("source", help="Directory of .xlsx record books, or a manifest file with one 'path[,start,end]' per line.")
+    batch_parser.add_argument("--start-date", default=START_DATE, help="Default start date (YYYY-MM-DD).")
+    batch_parser.add_argument("--end-date", default=END_DATE, help="Default end date (YYYY-MM-DD).")
+    batch_parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Record books processed in parallel.")
+    batch_parser.add_argument("--state-file", default=BATCH_STATE_FILE, help="Checkpoint file used to resume interrupted runs.")
+
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        run_batch(args.source, args.start_date, args.end_date, args.workers, args.state_file)
+    else:
+        generate_weekly_report(START_DATE, END_DATE, SHEET_NAME, TASK_SHEET_NAME, ACTIVITY_NUMS_SHEET_NAME)
+
+
+if __name__ == "__main__":
+    main()
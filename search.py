@@ -0,0 +1,115 @@
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from database import engine
+
+logger = logging.getLogger("logbook.search")
+
+# Columns of week_entries mirrored into the FTS5 index, with their bm25 weights
+INDEXED_COLUMNS = (
+    ("tasks_summary", 2.0),
+    ("problems", 1.0),
+    ("solutions", 1.0),
+    ("supervisor_comment", 1.0),
+)
+
+_COLUMNS = ", ".join(name for name, _ in INDEXED_COLUMNS)
+_NEW_VALUES = ", ".join(f"new.{name}" for name, _ in INDEXED_COLUMNS)
+_OLD_VALUES = ", ".join(f"old.{name}" for name, _ in INDEXED_COLUMNS)
+_WEIGHTS = ", ".join(str(weight) for _, weight in INDEXED_COLUMNS)
+
+# External-content FTS5 table: the text lives in week_entries only, and triggers keep
+# the index in step with every write path (ORM, bulk insert and executemany updates).
+_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE week_search USING fts5(
+        {_COLUMNS}, content='week_entries', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS week_search_insert AFTER INSERT ON week_entries BEGIN
+        INSERT INTO week_search(rowid, {_COLUMNS}) VALUES (new.id, {_NEW_VALUES});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS week_search_delete AFTER DELETE ON week_entries BEGIN
+        INSERT INTO week_search(week_search, rowid, {_COLUMNS}) VALUES ('delete', old.id, {_OLD_VALUES});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS week_search_update AFTER UPDATE OF {_COLUMNS} ON week_entries BEGIN
+        INSERT INTO week_search(week_search, rowid, {_COLUMNS}) VALUES ('delete', old.id, {_OLD_VALUES});
+        INSERT INTO week_search(rowid, {_COLUMNS}) VALUES (new.id, {_NEW_VALUES});
+    END""",
+]
+
+_TERM = re.compile(r"\w+\*?")
+
+def ensure_search_index(bind=engine):
+    """
+    Creates the FTS5 index and its sync triggers, back-filling it from existing weeks
+    the first time it is created.
+    """
+    if bind.dialect.name != "sqlite":
+        logger.warning("Full-text search needs SQLite FTS5, skipping index on %s", bind.dialect.name)
+        return
+    with bind.begin() as conn:
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'week_search'"
+        )).first()
+        if not exists:
+            for statement in _SCHEMA:
+                conn.execute(text(statement))
+            conn.execute(text("INSERT INTO week_search(week_search) VALUES ('rebuild')"))
+            logger.info("Created full-text search index")
+        # Persisted column weights let ORDER BY rank use the index's own bm25 ordering
+        conn.execute(text(f"INSERT INTO week_search(week_search, rank) VALUES ('rank', 'bm25({_WEIGHTS})')"))
+
+def to_match_query(query: str) -> str:
+    """
+    Turns free text into an FTS5 query that ANDs every word, so user input can never
+    be a syntax error. A trailing * keeps prefix matching ("migrat*").
+    """
+    terms = []
+    for term in _TERM.findall(query):
+        prefix = term.endswith("*")
+        word = term.rstrip("*")
+        if word:
+            terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return " ".join(terms)
+
+def search_weeks(
+    db: Session,
+    query: str,
+    status: Optional[str] = None,
+    student_name: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> Tuple[int, List[Dict]]:
+    """
+    Ranked (bm25) search over week text. Returns (total matches, one page of hits).
+    """
+    match = to_match_query(query)
+    if not match:
+        return 0, []
+
+    filters = ""
+    params = {"match": match, "limit": limit, "offset": offset}
+    if status:
+        filters += " AND r.status = :status"
+        params["status"] = status
+    if student_name:
+        filters += " AND r.student_name = :student_name"
+        params["student_name"] = student_name
+
+    source = f"""
+        FROM week_search
+        JOIN week_entries w ON w.id = week_search.rowid
+        JOIN reports r ON r.id = w.report_id
+        WHERE week_search MATCH :match{filters}
+    """
+    total = db.execute(text(f"SELECT count(*) {source}"), params).scalar_one()
+    rows = db.execute(text(f"""
+        SELECT w.id AS week_id, w.report_id, w.week_ending, r.student_name, r.status,
+               snippet(week_search, -1, '[', ']', '...', 16) AS snippet,
+               week_search.rank AS score
+        {source}
+        ORDER BY week_search.rank
+        LIMIT :limit OFFSET :offset
+    """), params).mappings().all()
+    return total, [dict(row) for row in rows]
@@ -0,0 +1,56 @@
+import io
+import os
+import logging
+from typing import Optional
+
+# Signature is stored pre-sized to the box it is drawn into on every week
+SIGNATURE_DIR = "signatures"
+SIGNATURE_FILE = "supervisor.png"
+SIGNATURE_SIZE = (120, 35)
+
+logger = logging.getLogger("logbook.signatures")
+
+def _signature_path() -> str:
+    return os.path.join(SIGNATURE_DIR, SIGNATURE_FILE)
+
+def normalize_signature(image_bytes: bytes) -> bytes:
+    """
+    Decodes an uploaded signature once and re-encodes it as a 120x35 RGBA PNG.
+    Raises ValueError if the bytes are not a readable image.
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            resized = img.convert("RGBA").resize(SIGNATURE_SIZE, Image.LANCZOS)
+    except OSError as e:
+        # UnidentifiedImageError for non-images, plain OSError for truncated or corrupt ones
+        raise ValueError(f"Signature must be an image file: {e}") from e
+    output = io.BytesIO()
+    resized.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+def save_signature(image_bytes: bytes) -> bytes:
+    """
+    Normalizes and stores the supervisor signature, replacing any previous one.
+    """
+    normalized = normalize_signature(image_bytes)
+    os.makedirs(SIGNATURE_DIR, exist_ok=True)
+    tmp_path = f"{_signature_path()}.{os.getpid()}.tmp" # per process, so concurrent uploads never share a temp file
+    with open(tmp_path, "wb") as f:
+        f.write(normalized)
+    os.replace(tmp_path, _signature_path())
+    logger.info("Stored supervisor signature (%d bytes -> %d bytes)", len(image_bytes), len(normalized))
+    return normalized
+
+def load_signature() -> Optional[bytes]:
+    """
+    Returns the stored, already-normalized signature PNG, or None if none was saved.
+    Read from disk every time (it is a few KB) so an upload handled by another worker
+    process is picked up immediately.
+    """
+    try:
+        with open(_signature_path(), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,54 @@
+import datetime
+from itertools import groupby
+from typing import Dict, List, NamedTuple, Tuple
+
+
+class WeekBucket(NamedTuple):
+    """Tasks falling inside one Monday-Sunday week, clipped to the requested range."""
+    week_start: datetime.date
+    week_ending: datetime.date
+    tasks: Tuple[Tuple[datetime.date, str], ...]
+
+    @property
+    def summary_text(self) -> str:
+        return "".join(f"- {description}\n" for _, description in self.tasks)
+
+
+def _monday_ordinal(day: datetime.date) -> int:
+    return day.toordinal() - day.weekday()
+
+
+def bucket_tasks_by_week(
+    tasks: Dict[datetime.date, str],
+    start_date: datetime.date,
+    end_date: datetime.date,
+    include_empty: bool = False,
+) -> List[WeekBucket]:
+    """
+    Groups dated tasks into weeks ending on Sunday (or on end_date for the last week).
+    Runs in one sorted pass over the task records instead of walking every calendar day.
+    """
+    if end_date < start_date:
+        return []
+
+    in_range = sorted(item for item in tasks.items() if start_date <= item[0] <= end_date)
+    grouped = {
+        monday: tuple(items)
+        for monday, items in groupby(in_range, key=lambda item: _monday_ordinal(item[0]))
+    }
+
+    if include_empty:
+        mondays = range(_monday_ordinal(start_date), _monday_ordinal(end_date) + 1, 7)
+    else:
+        mondays = grouped.keys()
+
+    start_ordinal = start_date.toordinal()
+    end_ordinal = end_date.toordinal()
+    buckets = []
+    for monday in mondays:
+        buckets.append(WeekBucket(
+            week_start=datetime.date.fromordinal(max(monday, start_ordinal)),
+            week_ending=datetime.date.fromordinal(min(monday + 6, end_ordinal)),
+            tasks=grouped.get(monday, ()),
+        ))
+    return buckets
@@ -0,0 +1,43 @@
+import datetime
+import io
+from zipfile import ZipFile, ZIP_DEFLATED
+from openpyxl import Workbook
+from openpyxl.drawing.image import Image
+from openpyxl.writer.excel import ExcelWriter
+
+class SharedImage(Image):
+    """
+    Extra anchor for an image that is already in the workbook. Points at the
+    primary image's media part instead of embedding another copy.
+    """
+
+    def __init__(self, primary: Image, anchor: str):
+        self.primary = primary
+        self.ref = primary.ref
+        self.width = primary.width
+        self.height = primary.height
+        self.format = primary.format
+        self.anchor = anchor
+
+    @property
+    def path(self):
+        return self.primary.path
+
+class SharedMediaWriter(ExcelWriter):
+    """ExcelWriter that writes each media part once, however many anchors reference it."""
+
+    def _write_images(self):
+        written = set()
+        for img in self._images:
+            if img.path in written:
+                continue
+            written.add(img.path)
+            self._archive.writestr(img.path[1:], img._data())
+
+def save_workbook(wb: Workbook) -> io.BytesIO:
+    output = io.BytesIO()
+    archive = ZipFile(output, 'w', ZIP_DEFLATED, allowZip64=True)
+    wb.properties.modified = datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+    SharedMediaWriter(wb, archive).save()
+    output.seek(0)
+    return output